@@ -1,9 +1,12 @@
 import argparse
 import json
+import os
 
 from pycg import formats
+from pycg.machinery.memory import memory_profiler
+from pycg.machinery.traces import tracer
 from pycg.pycallgraph import CallGraphGenerator
-from pycg.utils.constants import CALL_GRAPH_OP, KEY_ERR_OP
+from pycg.utils.constants import CALL_GRAPH_OP, IMPORT_FILTER, KEY_ERR_OP, SUBSTRING_FILTER
 
 
 def main():
@@ -13,7 +16,14 @@ def main():
         "--package", help="Package containing the code to be analyzed", default=None
     )
     parser.add_argument(
-        "--sinks", help="The methods that may lead to fragility risk.", default=None
+        "--sinks",
+        nargs="+",
+        help=(
+            "The methods that may lead to fragility risk. "
+            "When several sink files are given, each sink family is analyzed in turn "
+            "and --output/--as-graph-output name directories holding one file per family."
+        ),
+        default=None,
     )
     parser.add_argument(
         "--fasten",
@@ -60,35 +70,159 @@ def main():
     parser.add_argument("--complete",
                         help="Full analysis (but may reduce performance and cause high false positives)", default=False)
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching parse results across runs (disabled if not specified)",
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help="Maximum size of the cache directory in megabytes",
+        default=1024,
+    )
+
+    parser.add_argument(
+        "--prefilter",
+        type=str,
+        choices=[SUBSTRING_FILTER, IMPORT_FILTER],
+        help=(
+            "How candidate sink files are selected. "
+            + SUBSTRING_FILTER
+            + " (default) matches the sink names textually, "
+            + IMPORT_FILTER
+            + " requires the sink module to be imported or the builtin sink to be called."
+        ),
+        default=SUBSTRING_FILTER,
+    )
 
-    cg = CallGraphGenerator(
-        args.entry_point, args.sinks, args.package, args.max_iter, args.operation, args.complete
+    parser.add_argument(
+        "--state-dir",
+        help=(
+            "Directory where the results of each run are kept. A later run over the same package "
+            "reuses them when none of its changes reach the analyzed modules."
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--changed-files",
+        nargs="*",
+        help="Files changed since the previous run, relative to the package (requires --state-dir)",
+        default=None,
     )
-    cg.analyze()
 
-    if args.operation == CALL_GRAPH_OP:
-        if args.fasten:
-            formatter = formats.Fasten(
-                cg, args.package, args.product, args.forge, args.version, args.timestamp
-            )
+    parser.add_argument(
+        "--max-points-to",
+        type=int,
+        help=(
+            "Widen the points-to sets holding more targets than this to the classes and modules of "
+            "their targets; calls through a widened set still reach every target it summarized. Every "
+            "widened name is logged and listed in --trace-out. Trades precision for time (disabled if not specified)."
+        ),
+        default=None,
+    )
+
+    parser.add_argument(
+        "--trace-out",
+        help="Write the time spent in each phase, pass and module as a Chrome trace to this file",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--memory-report",
+        nargs="?",
+        const="",
+        help=(
+            "Record the peak RSS, the largest allocation sites and the size of every manager at each phase "
+            "boundary. The JSON report is written to the given path, or next to --output if no path is given."
+        ),
+        default=None,
+    )
+
+    args = parser.parse_args()
+
+    if args.trace_out:
+        tracer.enable()
+    if args.memory_report is not None:
+        memory_profiler.enable()
+
+    sink_files = args.sinks or [None]
+    multiple = len(sink_files) > 1
+    outputs = {}
+
+    # the parsed sources are shared between the runs of all sink families
+    ast_manager = None
+    for sink_file in sink_files:
+        cg = CallGraphGenerator(
+            args.entry_point, sink_file, args.package, args.max_iter, args.operation, args.complete,
+            cache_dir=args.cache_dir, cache_size=args.cache_size * 1024 * 1024, ast_manager=ast_manager,
+            prefilter=args.prefilter, state_dir=args.state_dir, changed_files=args.changed_files,
+            max_points_to=args.max_points_to,
+        )
+        with tracer.span("sinks", "family", sinks=sink_file):
+            cg.analyze()
+        ast_manager = cg.ast_manager
+
+        if args.operation == CALL_GRAPH_OP:
+            if args.fasten:
+                formatter = formats.Fasten(
+                    cg, args.package, args.product, args.forge, args.version, args.timestamp
+                )
+            else:
+                formatter = formats.Simple(cg)
+            with tracer.span("output", "phase", sinks=sink_file):
+                output = formatter.generate()
         else:
-            formatter = formats.Simple(cg)
-        output = formatter.generate()
-    else:
-        output = cg.output_key_errs()
-
-    as_formatter = formats.AsGraph(cg)
-
-    if args.output:
-        with open(args.output, "w+") as f:
-            f.write(json.dumps(output))
-    else:
-        print(json.dumps(output))
-
-    if args.as_graph_output:
-        with open(args.as_graph_output, "w+") as f:
-            f.write(json.dumps(as_formatter.generate()))
+            output = cg.output_key_errs()
+
+        as_formatter = formats.AsGraph(cg)
+
+        if not multiple:
+            outputs = output
+            output_path = args.output
+            as_graph_path = args.as_graph_output
+        else:
+            family = get_family_name(sink_file)
+            outputs[family] = output
+            output_path = get_family_path(args.output, family)
+            as_graph_path = get_family_path(args.as_graph_output, family)
+
+        if output_path:
+            with open(output_path, "w+") as f:
+                f.write(json.dumps(output))
+
+        if as_graph_path:
+            with open(as_graph_path, "w+") as f:
+                f.write(json.dumps(as_formatter.generate()))
+
+    if args.trace_out:
+        tracer.write(args.trace_out)
+    if args.memory_report is not None:
+        memory_profiler.write(get_memory_report_path(args.memory_report, args.output, multiple))
+
+    if not args.output:
+        print(json.dumps(outputs))
+
+
+def get_memory_report_path(memory_report, output, multiple):
+    if memory_report:
+        return memory_report
+    if not output:
+        return "memory.json"
+    if multiple:
+        return os.path.join(output, "memory.json")
+    return os.path.splitext(output)[0] + ".memory.json"
+
+
+def get_family_name(sink_file):
+    return os.path.basename(sink_file).replace(".txt", "")
+
+
+def get_family_path(directory, family):
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, family + ".json")
 
 
 if __name__ == "__main__":
@@ -18,6 +18,7 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+from ..machinery.traces import tracer
 from .base import BaseFormatter
 
 
@@ -43,7 +44,8 @@ class Simple(BaseFormatter):
         for sink in sinks:
             if sink not in output_re:
                 continue
-            self.find_all_paths(sink, [], output_re, [], dict())
+            with tracer.span("find_all_paths", "paths", sink=sink):
+                self.find_all_paths(sink, [], output_re, [], dict())
         for index, path in enumerate(self.all_paths):
             path_key = f'Path{index + 1}'
             path_str = ' -> '.join(reversed(path))
@@ -0,0 +1,80 @@
+import ast
+import os
+
+
+class AstManager(object):
+    """Reads and parses each analyzed file once per run"""
+
+    def __init__(self, parse_cache=None):
+        self.contents = {}
+        self.trees = {}
+        self.names = {}
+        self.sources = set()
+        self.parse_cache = parse_cache
+
+    def get_parse_cache(self):
+        return self.parse_cache
+
+    def read_source(self, filename):
+        # strict utf-8 read used for file discovery, shared by every run
+        # that analyzes the same package
+        filename = os.path.abspath(filename)
+        if filename not in self.sources:
+            with open(filename, "r", encoding="utf-8") as f:
+                self.contents[filename] = f.read()
+            self.sources.add(filename)
+        return self.contents[filename]
+
+    def get_contents(self, filename):
+        filename = os.path.abspath(filename)
+        if filename not in self.contents:
+            with open(filename, "rt", errors="replace") as f:
+                self.contents[filename] = f.read()
+        return self.contents[filename]
+
+    def get_tree(self, filename):
+        filename = os.path.abspath(filename)
+        if filename not in self.trees:
+            contents = self.get_contents(filename)
+            tree = None
+            if self.parse_cache:
+                tree = self.parse_cache.load(contents, "ast")
+            if tree is None:
+                tree = ast.parse(contents, filename)
+                if self.parse_cache:
+                    self.parse_cache.store(contents, "ast", tree)
+            self.trees[filename] = tree
+        return self.trees[filename]
+
+    def get_imports_and_calls(self, filename):
+        filename = os.path.abspath(filename)
+        if filename not in self.names and self.parse_cache:
+            names = self.parse_cache.load(self.get_contents(filename), "names")
+            if names is not None:
+                self.names[filename] = names
+        if filename not in self.names:
+            imported = set()
+            called = set()
+            for node in ast.walk(self.get_tree(filename)):
+                if isinstance(node, ast.Call):
+                    if isinstance(node.func, ast.Name):
+                        called.add(node.func.id)
+                    elif isinstance(node.func, ast.Attribute):
+                        called.add(node.func.attr)
+                elif isinstance(node, ast.Import):
+                    for alias in node.names:
+                        imported.add(alias.name)
+                elif isinstance(node, ast.ImportFrom):
+                    # relative imports stay inside the analyzed package
+                    if node.level or not node.module:
+                        continue
+                    imported.add(node.module)
+                    for alias in node.names:
+                        imported.add(node.module + "." + alias.name)
+            self.names[filename] = (imported, called)
+            if self.parse_cache:
+                self.parse_cache.store(self.get_contents(filename), "names", self.names[filename])
+        return self.names[filename]
+
+    def get_trees(self):
+        return self.trees
@@ -0,0 +1,135 @@
+# below this many definitions to recompute the python closure is faster
+BITSET_THRESHOLD = 50000
+# with fewer pointer entries per definition the closures stay small and
+# python set unions beat decoding the bit rows
+BITSET_MIN_DEGREE = 4
+# upper bound for the bit matrix of one column block
+MAX_BLOCK_BYTES = 256 * 1024 * 1024
+
+
+def is_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def should_use(nodes, edges):
+    # numpy is only imported once a closure is large enough to need it,
+    # most runs never get there and would just pay for the import
+    return nodes >= BITSET_THRESHOLD and edges >= BITSET_MIN_DEGREE * nodes and is_available()
+
+
+def close_components(seeds, edges):
+    """
+    Computes result[c] = seeds[c] | result[d] for every d in edges[c], where
+    components are given in reverse topological order so every edge points
+    to a smaller index. Names are packed into dense column ids and every
+    component keeps a bit row; the components of one level of the DAG are
+    closed together with a single gather and reduceat. Columns are processed
+    in blocks so the matrix stays under MAX_BLOCK_BYTES. Components with the
+    same closure share one frozenset.
+    """
+    import numpy
+
+    count = len(seeds)
+    columns = {}
+    names = []
+    seed_rows = []
+    seed_cols = []
+    for comp, seed in enumerate(seeds):
+        for name in seed:
+            col = columns.get(name)
+            if col is None:
+                col = columns[name] = len(names)
+                names.append(name)
+            seed_rows.append(comp)
+            seed_cols.append(col)
+
+    # a component sits one level above the highest component it reaches
+    level = [0] * count
+    by_level = {}
+    for comp in range(count):
+        if edges[comp]:
+            level[comp] = 1 + max(level[succ] for succ in edges[comp])
+            by_level.setdefault(level[comp], []).append(comp)
+
+    batches = []
+    for current in sorted(by_level):
+        comps = by_level[current]
+        targets = []
+        offsets = []
+        for comp in comps:
+            offsets.append(len(targets))
+            targets.extend(edges[comp])
+        batches.append((
+            numpy.array(comps, dtype=numpy.intp),
+            numpy.array(targets, dtype=numpy.intp),
+            numpy.array(offsets, dtype=numpy.intp),
+        ))
+
+    names = numpy.array(names, dtype=object)
+    seed_rows = numpy.array(seed_rows, dtype=numpy.intp)
+    seed_cols = numpy.array(seed_cols, dtype=numpy.int64)
+    total_words = (len(names) + 63) // 64
+    block_words = max(1, MAX_BLOCK_BYTES // (8 * max(count, 1)))
+    block_keys = []
+    block_names = []
+
+    for start in range(0, total_words, block_words):
+        stop = min(total_words, start + block_words)
+        rows = numpy.zeros((count, stop - start), dtype=numpy.uint64)
+
+        in_block = (seed_cols >= start * 64) & (seed_cols < stop * 64)
+        cols = seed_cols[in_block] - start * 64
+        numpy.bitwise_or.at(
+            rows,
+            (seed_rows[in_block], cols >> 6),
+            numpy.left_shift(numpy.uint64(1), (cols & 63).astype(numpy.uint64)),
+        )
+
+        for comps, targets, offsets in batches:
+            rows[comps] |= numpy.bitwise_or.reduceat(rows[targets], offsets, axis=0)
+
+        # many components end up with the same row, only distinct rows are decoded
+        rows, inverse = numpy.unique(rows, axis=0, return_inverse=True)
+        block_keys.append(inverse.reshape(-1))
+        block_names.append(decode_rows(rows, names[start * 64:stop * 64]))
+
+    if not block_keys:
+        return [frozenset()] * count
+
+    # a component is identified by the distinct row it got in every block
+    combos, inverse = numpy.unique(numpy.stack(block_keys, axis=1), axis=0, return_inverse=True)
+    results = []
+    for combo in combos.tolist():
+        items = []
+        for block, row in enumerate(combo):
+            items.extend(block_names[block][row])
+        results.append(frozenset(items))
+    return [results[index] for index in inverse.reshape(-1).tolist()]
+
+
+def decode_rows(rows, names):
+    import numpy
+
+    decoded = [[] for _ in range(len(rows))]
+    width = rows.shape[1] * 64
+    names = numpy.concatenate((names, numpy.empty(width - len(names), dtype=object)))
+    # expand the bits a slice of rows at a time, numpy finds the set ones
+    # in the flattened slice faster than in the two dimensional one
+    step = max(1, MAX_BLOCK_BYTES // (8 * width))
+    for first in range(0, len(rows), step):
+        chunk = rows[first:first + step].astype("<u8").view(numpy.uint8)
+        found_rows, found_cols = numpy.divmod(
+            numpy.flatnonzero(numpy.unpackbits(chunk, axis=1, bitorder="little")), width
+        )
+        if not len(found_rows):
+            continue
+        # the indices are row major, so every row is one contiguous run
+        bounds = numpy.flatnonzero(numpy.diff(found_rows)) + 1
+        firsts = (found_rows[numpy.r_[0, bounds]] + first).tolist()
+        for row, group in zip(firsts, numpy.split(names[found_cols], bounds)):
+            decoded[row] = group.tolist()
+    return decoded
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+
+class ParseCache(object):
+    """On-disk cache of per-file analysis results keyed by content hash"""
+
+    def __init__(self, cache_dir, max_size=None):
+        # entries produced by another interpreter version are never reused
+        self.cache_dir = os.path.join(
+            os.path.abspath(cache_dir), sys.implementation.cache_tag
+        )
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _get_path(self, contents, kind):
+        digest = hashlib.sha256(
+            contents.encode("utf-8", "surrogatepass")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + "." + kind)
+
+    def load(self, contents, kind):
+        path = self._get_path(contents, kind)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except Exception:
+            return None
+
+        # refresh the entry so that pruning evicts the least recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def store(self, contents, kind, value):
+        path = self._get_path(contents, kind)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry {path}: {e}")
+
+    def prune(self):
+        if not self.max_size:
+            return
+
+        entries = []
+        total = 0
+        for root, dirs, files in os.walk(self.cache_dir):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
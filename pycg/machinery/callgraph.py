@@ -18,6 +18,9 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import sys
+
+
 class CallGraph(object):
     def __init__(self):
         self.cg = {}
@@ -34,6 +37,7 @@ class CallGraph(object):
             raise CallGraphError("Only string node names allowed")
         if not name:
             raise CallGraphError("Empty node name")
+        name = sys.intern(name)
 
         if name not in self.cg:
             self.cg[name] = []
@@ -54,6 +58,8 @@ class CallGraph(object):
     def add_edge(self, src, dest):
         self.add_node(src)
         self.add_node(dest)
+        src = sys.intern(src)
+        dest = sys.intern(dest)
         if dest not in self.cg[src]:
             self.cg[src].append(dest)
         self.re_cg[dest].add(src)
@@ -18,18 +18,41 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+from pycg.machinery.dependencies import CLASS
+
+
 class ClassManager:
     def __init__(self):
         self.names = {}
+        # bumped whenever a class is created or its mro changes
+        self.epoch = 0
+        self.dependency_manager = None
+
+    def get_epoch(self):
+        return self.epoch
+
+    def inc_epoch(self):
+        self.epoch += 1
+
+    def set_dependency_manager(self, dependency_manager):
+        self.dependency_manager = dependency_manager
+
+    def mark_changed(self, name):
+        self.inc_epoch()
+        if self.dependency_manager:
+            self.dependency_manager.mark_changed(CLASS, name)
 
     def get(self, name):
+        if self.dependency_manager:
+            self.dependency_manager.mark_read(CLASS, name)
         if name in self.names:
             return self.names[name]
 
     def create(self, name, module):
         if name not in self.names:
-            cls = ClassNode(name, module)  # 类节点
+            cls = ClassNode(name, module, self)  # 类节点
             self.names[name] = cls
+            self.mark_changed(name)
         return self.names[name]
 
     def get_classes(self):
@@ -37,18 +60,30 @@ class ClassManager:
 
 
 class ClassNode:
-    def __init__(self, ns, module):
+    __slots__ = ("ns", "module", "mro", "class_manager", "prev_mro")
+
+    def __init__(self, ns, module, class_manager=None):
         self.ns = ns
         self.module = module
         self.mro = [ns]
+        self.class_manager = class_manager
+        # the mro before clear_mro, compared once compute_mro rebuilt it
+        self.prev_mro = None
+
+    def mark_changed(self, old_mro):
+        if self.class_manager and self.mro != old_mro:
+            self.class_manager.mark_changed(self.ns)
 
     def add_parent(self, parent):
+        old_mro = self.mro[:] if self.prev_mro is None else None
         if isinstance(parent, str):
             self.mro.append(parent)
         elif isinstance(parent, list):
             for item in parent:
                 self.mro.append(item)
         self.fix_mro()
+        if old_mro is not None:
+            self.mark_changed(old_mro)
 
     def fix_mro(self):
         new_mro = []
@@ -65,6 +100,7 @@ class ClassNode:
         return self.module
 
     def compute_mro(self):
+        old_mro = self.prev_mro if self.prev_mro is not None else self.mro[:]
         res = []
         self.mro.reverse()
         for parent in self.mro:
@@ -73,6 +109,10 @@ class ClassNode:
 
         res.reverse()
         self.mro = res
+        self.prev_mro = None
+        self.mark_changed(old_mro)
 
     def clear_mro(self):
+        if self.prev_mro is None:
+            self.prev_mro = self.mro
         self.mro = [self.ns]
@@ -0,0 +1,128 @@
+class ClosureManager(object):
+    """
+    Owns the closure and taint maps of a run. Every processor reads the same
+    maps, and each one is only recomputed when the definition manager has
+    queued a change for it since the last refresh.
+    """
+
+    def __init__(self, def_manager):
+        self.def_manager = def_manager
+        self.closured = None
+        # the closure as the processors read it, once some set is widened
+        self.expanded = None
+        self.taints = None
+        # bumped every time one of the maps is recomputed
+        self.version = 0
+
+    def get_version(self):
+        return self.version
+
+    def get_closure(self):
+        if self.closured is None or self.def_manager.has_name_changes():
+            self.closured = NamedClosure(self.def_manager.transitive_closure(), self.def_manager)
+            self.expanded = None
+            self.version += 1
+        if not self.def_manager.get_summaries():
+            return self.closured
+        if self.expanded is None:
+            self.expanded = ExpandedClosure(self.closured, self.def_manager)
+        return self.expanded
+
+    def get_taints(self):
+        if self.taints is None or self.def_manager.has_taint_changes():
+            self.taints = NamedTaints(self.def_manager.transitive_taints(), self.def_manager)
+            self.version += 1
+        return self.taints
+
+
+class NamedClosure(object):
+    """
+    Read-only view of the closure computed on namespace ids, which looks the
+    keys up by name and hands out the names of the items.
+    """
+
+    __slots__ = ("values", "def_manager", "symbol_manager")
+
+    def __init__(self, values, def_manager):
+        self.values = values
+        self.def_manager = def_manager
+        self.symbol_manager = def_manager.get_symbol_manager()
+
+    def get(self, key, default=None):
+        items = self.values.get(self.symbol_manager.find_id(key))
+        if items is None:
+            return default
+        return self.def_manager.get_result_names(items)
+
+    def __getitem__(self, key):
+        items = self.get(key)
+        if items is None:
+            raise KeyError(key)
+        return items
+
+    def __contains__(self, key):
+        return self.symbol_manager.find_id(key) in self.values
+
+    def __len__(self):
+        return len(self.values)
+
+
+class NamedTaints(object):
+    """Read-only view of the tainted namespace ids, looked up by name"""
+
+    __slots__ = ("values", "symbol_manager")
+
+    def __init__(self, values, def_manager):
+        self.values = values
+        self.symbol_manager = def_manager.get_symbol_manager()
+
+    def __contains__(self, key):
+        return self.symbol_manager.find_id(key) in self.values
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ExpandedClosure(object):
+    """
+    Read-only view of the closure in which the summaries held by widened
+    sets are expanded back to the targets they stand for, so the widened
+    closure stays small while every reader still sees an over-approximation.
+    """
+
+    __slots__ = ("values", "def_manager", "version", "cache")
+
+    def __init__(self, values, def_manager):
+        self.values = values
+        self.def_manager = def_manager
+        self.version = def_manager.get_summary_version()
+        # closure set -> (expanded set, summaries it went through)
+        self.cache = {}
+
+    def expand(self, items):
+        if self.version != self.def_manager.get_summary_version():
+            self.version = self.def_manager.get_summary_version()
+            self.cache = {}
+        cached = self.cache.get(items)
+        if cached is None:
+            cached = self.cache[items] = self.def_manager.expand_summaries(items, self.values)
+        expanded, summaries = cached
+        # the readers depend on the targets of the summaries as well
+        for summary in summaries:
+            self.def_manager.mark_read(summary)
+        return expanded
+
+    def get(self, key, default=None):
+        items = self.values.get(key)
+        if items is None:
+            return default
+        return self.expand(items)
+
+    def __getitem__(self, key):
+        return self.expand(self.values[key])
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __len__(self):
+        return len(self.values)
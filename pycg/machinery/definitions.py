@@ -18,10 +18,16 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import sys
 from calendar import different_locale
 
 from pycg import utils
-from pycg.machinery.pointers import LiteralPointer, NamePointer, TaintPointer
+from pycg.machinery import bitsets
+from pycg.machinery.dependencies import CLOSURE, DEFINITION, TAINT
+from pycg.machinery.pointers import EMPTY_VALUES, LiteralPointer, NamePointer, TaintPointer
+from pycg.machinery.reachability import iter_components
+from pycg.machinery.symbols import SymbolManager
+from pycg.machinery.traces import tracer
 from pycg.utils.constants import NO_CHANGE
 
 
@@ -31,10 +37,167 @@ class DefinitionManager(object):
         self.change_named_defs = set()
         self.change_taint_defs = set()
         self.re_taint_graph = {}
+        # the closure and taint maps below hold the ids of the namespaces
+        self.symbol_manager = SymbolManager()
         self.pre_closured = {}
-        self.pre_reversed_closured = {}
-        self.pre_taints = {}
-        self.pre_reversed_taints = {}
+        # name -> definitions whose name pointer holds it
+        self.pointed_by = {}
+        # definitions complete_definitions has to revisit, and the ones
+        # created since it last ran
+        self.change_complete_defs = set()
+        self.created_defs = set()
+        # name -> definitions whose arguments hold it
+        self.arg_holders = {}
+        # canonical frozensets shared by every closure entry with the same items
+        self.result_sets = {}
+        # closure set -> the names of its items, filled as the sets are read
+        self.result_names = {}
+        # name -> definitions whose taint pointer holds it
+        self.taint_pointed_by = {}
+        # definitions that reach a sink through taint pointers
+        self.tainted = set()
+        # bumped whenever a definition or its name/literal pointers change
+        self.epoch = 0
+        # set while the post processor tracks what its units read
+        self.dependency_manager = None
+        # name pointers holding more targets than this are widened
+        self.max_points_to = None
+        # widened definition -> number of targets it held
+        self.widened = {}
+        # summary of a class or module -> the targets of widened sets it stands for
+        self.summaries = {}
+        # bumped whenever a summary stands for a new target
+        self.summary_version = 0
+
+    def get_epoch(self):
+        return self.epoch
+
+    def get_symbol_manager(self):
+        return self.symbol_manager
+
+    def inc_epoch(self):
+        self.epoch += 1
+
+    def set_dependency_manager(self, dependency_manager):
+        self.dependency_manager = dependency_manager
+
+    def get_max_points_to(self):
+        return self.max_points_to
+
+    def set_max_points_to(self, max_points_to):
+        self.max_points_to = max_points_to
+
+    def is_widened(self, ns):
+        return ns in self.widened
+
+    def get_widened(self):
+        return self.widened
+
+    def add_widened(self, ns, size):
+        self.widened[ns] = size
+        print(f"widened the points-to set of {ns}: {size} targets summarized by their classes and modules")
+
+    def summarize(self, ns):
+        # the summary a widened set holds instead of ns; it is a leaf of the
+        # closure, readers expand it back to ns through expand_summaries
+        container = self.get_container(ns)
+        if container is None:
+            return ns
+        summary = self.get_summary_name(container)
+        if summary not in self.defs:
+            self.create(summary, utils.constants.NAME_DEF, self.defs[container].get_module_name())
+            self.summaries[summary] = set()
+        members = self.summaries[summary]
+        if ns not in members:
+            members.add(ns)
+            self.summary_version += 1
+            # the sets holding the summary pass their arguments to ns as well
+            self.change_complete_defs.add(summary)
+            self.mark_changed(summary)
+        return summary
+
+    def get_summary_name(self, container):
+        return utils.join_ns(container, utils.constants.SUMMARY_NAME)
+
+    def get_summary_of(self, ns):
+        # the summary already standing for ns, if any
+        container = self.get_container(ns)
+        if container is None:
+            return None
+        summary = self.get_summary_name(container)
+        if ns in self.summaries.get(summary, ()):
+            return summary
+
+    def get_container(self, ns):
+        # the innermost class or module holding ns, classes and modules
+        # themselves are kept as they are
+        if not isinstance(ns, str) or ns in self.summaries:
+            return None
+        defi = self.defs.get(ns)
+        if defi and defi.get_type() in (utils.constants.CLS_DEF, utils.constants.MOD_DEF):
+            return None
+        name = ns
+        while "." in name:
+            name = name.rsplit(".", 1)[0]
+            defi = self.defs.get(name)
+            if defi and defi.get_type() in (utils.constants.CLS_DEF, utils.constants.MOD_DEF):
+                return name
+        return None
+
+    def get_targets(self, defi):
+        # the values of the name pointer, with any summary replaced by the
+        # targets it stands for
+        return self.expand_summaries(defi.get_name_pointer().get(), {})[0]
+
+    def get_summaries(self):
+        return self.summaries
+
+    def get_summary_version(self):
+        return self.summary_version
+
+    def expand_summaries(self, names, closured):
+        # a summary may be any of the targets it replaced, so whatever reads
+        # a widened set sees all of them; returns the names and the summaries
+        # that were expanded
+        stack = [name for name in names if name in self.summaries]
+        if not stack:
+            return names, ()
+        expanded = set(names)
+        seen = set()
+        while stack:
+            summary = stack.pop()
+            if summary in seen:
+                continue
+            seen.add(summary)
+            for member in self.summaries[summary]:
+                targets = closured.get(member) or (member,)
+                # a function or class may have reached itself through the set
+                defi = self.defs.get(member)
+                if defi and defi.get_type() in (utils.constants.FUN_DEF, utils.constants.CLS_DEF):
+                    targets = set(targets)
+                    targets.add(member)
+                for target in targets:
+                    expanded.add(target)
+                    if target in self.summaries:
+                        stack.append(target)
+        expanded -= seen
+        return frozenset(expanded), seen
+
+    def mark_read(self, ns):
+        if self.dependency_manager:
+            self.dependency_manager.mark_read(DEFINITION, ns)
+
+    def mark_changed(self, ns):
+        self.inc_epoch()
+        self.mark_dependents(ns)
+
+    def mark_dependents(self, ns, kind=DEFINITION):
+        if self.dependency_manager:
+            self.dependency_manager.mark_changed(kind, ns)
+
+    def mark_created(self, ns):
+        self.created_defs.add(ns)
+        self.mark_dependents(ns)
 
     def create(self, ns, def_type, mn):
         if not ns or not isinstance(ns, str):
@@ -46,11 +209,17 @@ class DefinitionManager(object):
         if not mn or not isinstance(mn, str):
             raise DefinitionError("Invalid module name argument")
 
+        ns = sys.intern(ns)
         self.defs[ns] = Definition(ns, def_type, mn, self)
+        self.mark_created(ns)
+        self.inc_epoch()
         return self.defs[ns]
 
     def assign(self, ns, defi, mn):
+        self.inc_epoch()
+        ns = sys.intern(ns)
         self.defs[ns] = Definition(ns, defi.get_type(), mn, self)
+        self.mark_created(ns)
         self.defs[ns].merge(defi)
 
         # if it is a function def, we need to create a return pointer
@@ -58,9 +227,11 @@ class DefinitionManager(object):
             return_ns = utils.join_ns(ns, utils.constants.RETURN_NAME)
             defi_return = utils.join_ns(defi.get_ns(), utils.constants.RETURN_NAME)
             self.defs[return_ns] = Definition(return_ns, utils.constants.NAME_DEF, mn, self)
+            self.mark_created(return_ns)
             self.defs[return_ns].get_name_pointer().add(defi_return)
             if defi_return not in self.defs:
                 self.defs[defi_return] = Definition(defi_return, utils.constants.NAME_DEF, defi.get_module_name(), self)
+                self.mark_created(defi_return)
             self.defs[defi_return].get_taint_pointer().add(return_ns)
             defi.get_taint_pointer().add(defi_return)
             self.defs[ns].get_taint_pointer().add(return_ns)
@@ -68,6 +239,8 @@ class DefinitionManager(object):
         return self.defs[ns]
 
     def get(self, ns):
+        if self.dependency_manager:
+            self.dependency_manager.mark_read(DEFINITION, ns)
         if ns in self.defs:
             return self.defs[ns]
 
@@ -80,6 +253,15 @@ class DefinitionManager(object):
     def add_change_taint_defs(self, defi):
         self.change_taint_defs.add(defi)
 
+    def has_name_changes(self):
+        return bool(self.change_named_defs)
+
+    def has_taint_changes(self):
+        return bool(self.change_taint_defs)
+
+    def add_change_complete_defs(self, defi):
+        self.change_complete_defs.add(defi.get_ns())
+
     def handle_function_def(self, parent_ns, fn_name, mn):
         full_ns = utils.join_ns(parent_ns, fn_name)
         defi = self.get(full_ns)
@@ -102,288 +284,255 @@ class DefinitionManager(object):
 
         return defi
 
+    def index_name_pointer(self, defi):
+        symbol = defi.get_symbol()
+        get_id = self.symbol_manager.get_id
+        for name in defi.get_name_pointer().get():
+            name = get_id(name)
+            if name not in self.pointed_by:
+                self.pointed_by[name] = set()
+            self.pointed_by[name].add(symbol)
+
+    def get_pointed_by(self, ns):
+        # the definitions whose name pointer holds ns
+        symbol = self.symbol_manager.find_id(ns)
+        if symbol is None or symbol not in self.pointed_by:
+            return ()
+        return self.symbol_manager.get_names(self.pointed_by[symbol])
+
+    def get_name_ids(self, defi):
+        # the ids of the definitions the name pointer of defi holds
+        defs = self.defs
+        get_id = self.symbol_manager.get_id
+        return [get_id(name) for name in defi.get_name_pointer().get() if name in defs]
+
+    def get_closure_dirty(self, changed):
+        # everything that reaches a changed definition through name pointers
+        dirty = set()
+        stack = [defi.get_symbol() for defi in changed]
+        while stack:
+            symbol = stack.pop()
+            if symbol in dirty:
+                continue
+            dirty.add(symbol)
+            stack.extend(self.pointed_by.get(symbol, ()))
+        return dirty
+
+    def get_result_set(self, items):
+        items = frozenset(items)
+        return self.result_sets.setdefault(items, items)
+
+    def get_result_names(self, items):
+        names = self.result_names.get(items)
+        if names is None:
+            names = self.result_names[items] = self.symbol_manager.get_names(items)
+        return names
+
+    def prune_result_sets(self):
+        # sets replaced by later closures stay in the store until it has
+        # grown to twice the closure, which keeps the rebuild amortized
+        if len(self.result_sets) > 2 * len(self.pre_closured):
+            self.result_sets = {items: items for items in self.pre_closured.values()}
+            self.result_names = {items: names for items, names in self.result_names.items()
+                                 if items in self.result_sets}
+
+    @tracer.traced("transitive_closure", "closure")
     def transitive_closure(self):
         closured = self.pre_closured
-        reversed_closured = self.pre_reversed_closured
-        CHANGED = (utils.constants.NAME_CHANGE, utils.constants.BOTH_CHANGE)
-        global_process_list = []
-        analyzed = set()
-
-        def dfs(defi):
-            # bottom
-            if closured.get(defi.get_ns(), None) is not None and defi.get_change_state() not in CHANGED or defi.get_ns() in analyzed:
-                return closured[defi.get_ns()]
-            if defi.get_change_state() in (utils.constants.BOTH_CHANGE, utils.constants.TAINT_CHANGE):
-               defi.turn_change_toTaint()
-            else:
-                defi.turn_change_toNochange()
-            analyzed.add(defi.get_ns())
+        defs = self.defs
 
-            name_pointer = defi.get_name_pointer()
-            new_set = set()
+        names = self.symbol_manager.names
 
-            if not name_pointer.get():
-                new_set.add(defi.get_ns())
+        if not closured:
+            for defi in defs.values():
+                defi.turn_change_toNochange()
+                self.index_name_pointer(defi)
+            dirty = {defi.get_symbol() for defi in defs.values()}
+        else:
+            for defi in self.change_named_defs:
+                self.index_name_pointer(defi)
+            dirty = self.get_closure_dirty(self.change_named_defs)
+        self.change_named_defs = set()
 
-            if not closured.get(defi.get_ns()):
-                closured[defi.get_ns()] = new_set
+        def get_successors(symbol):
+            # clean definitions keep the closure computed by a previous call
+            return [name for name in self.get_name_ids(defs[names[symbol]])
+                    if name in dirty or name not in closured]
 
-            if len(global_process_list) == 0:
-                for name in name_pointer.get():
-                    next_defi = self.defs.get(name, None)
-                    if not next_defi:
-                        continue
-                    items = dfs(next_defi)
-                    if not items:
-                        items = set([name])
-                    new_set = new_set.union(items)
+        roots = [symbol for symbol in dirty if names[symbol] in defs]
+        if len(roots) >= bitsets.BITSET_THRESHOLD and bitsets.should_use(
+                len(roots), sum(len(defs[names[symbol]].get_name_pointer().get()) for symbol in roots)):
+            components = list(iter_components(roots, get_successors))
+            results = self.close_with_bitsets(components, closured)
+        else:
+            components = iter_components(roots, get_successors)
+            results = None
+
+        for index, members in enumerate(components):
+            if results is None:
+                new_set = self.close_component(members, closured)
             else:
-                added_names = defi.get_added_names()
-                full_closure = closured.get(defi.get_ns(), set())
-                remaining_names = full_closure - added_names
-                for name in added_names:
-                    next_defi = self.defs.get(name, None)
-                    if not next_defi or name in new_set:
-                        continue
-                    items = dfs(next_defi)
-                    if not items:
-                        items = set([name])
-                    new_set = new_set.union(items)
+                new_set = results[index]
+            new_set = self.get_result_set(new_set)
+
+            # every member of a cycle shares the same closure
+            for symbol in members:
+                defi = defs[names[symbol]]
+                if defi.get_change_state() in (utils.constants.BOTH_CHANGE, utils.constants.TAINT_CHANGE):
+                    defi.turn_change_toTaint()
+                else:
+                    defi.turn_change_toNochange()
                 defi.clear_added_names()
-                for name in remaining_names:
-                    next_closured = self.defs.get(name, None)
-                    if not next_closured or name in new_set:
-                        continue
-                    items = dfs(next_closured)
-                    if not items:
-                        items = set([name])
-                    new_set = new_set.union(items)
-            old_different_set = closured[defi.get_ns()] - new_set
-            new_different_set = new_set - closured[defi.get_ns()]
-            closured[defi.get_ns()] = new_set
-
-            for dep in old_different_set:
-                if dep not in reversed_closured or defi.get_ns() not in reversed_closured[dep]:
-                    continue
-                reversed_closured[dep].remove(defi.get_ns())
-
-            for dep in new_different_set:
-                if dep not in reversed_closured:
-                    reversed_closured[dep] = set()
-                reversed_closured[dep].add(defi.get_ns())
-
-            return closured[defi.get_ns()]
+                if closured.get(symbol) is not new_set:
+                    self.mark_dependents(defi.get_ns(), CLOSURE)
+                closured[symbol] = new_set
 
-        def reversed_dfs(ns, visited=None, process_list=None, depth=0, max_depth=5):
-            if visited is None:
-                visited = set()
-            if process_list is None:
-                process_list = []
-
-            if ns in visited or depth > max_depth or ns in global_process_list:
-                return
-
-            visited.add(ns)
-
-            if depth == 0:
-                process_list.append(ns)
-
-            for upstream in reversed_closured.get(ns, []):
-                if upstream == ns:
-                    continue
-                reversed_dfs(upstream, visited, process_list, depth=depth + 1, max_depth=max_depth)
-
-            if depth > 0:
-                process_list.append(ns)
-
-            return process_list
+        self.pre_closured = closured
+        self.prune_result_sets()
+        return closured
 
-        if len(closured) == 0:
-            for ns, current_def in self.defs.items():
-                current_def.turn_change_toNochange()
-                if closured.get(ns, None) is None:
-                    dfs(current_def)
-        else:
-            for current_def in self.change_named_defs:
-                ns = current_def.get_ns()
-                global_process_list.extend(current_def.get_added_names())
-                if ns in global_process_list:
+    def is_cycle(self, members):
+        if len(members) > 1:
+            return True
+        ns = self.symbol_manager.get_ns(members[0])
+        return ns in self.defs[ns].get_name_pointer().get()
+
+    def close_component(self, members, closured):
+        # the components a member points to are already closed
+        component = set(members)
+        new_set = set()
+        for symbol in members:
+            defi = self.defs[self.symbol_manager.get_ns(symbol)]
+            if not defi.get_name_pointer().get():
+                new_set.add(symbol)
+            for name in self.get_name_ids(defi):
+                if name in component:
                     continue
-                if current_def.get_change_state() in CHANGED or ns not in closured:
-                    global_process_list += reversed_dfs(ns)
-            self.change_named_defs.clear()
-            global_process_list = list(dict.fromkeys(global_process_list))
-            for affected in global_process_list:
-                affected_defi = self.defs.get(affected, None)
-                if not affected_defi:
-                    continue
-                if affected_defi.get_change_state() in (utils.constants.TAINT_CHANGE, utils.constants.BOTH_CHANGE):
-                    affected_defi.turn_change_toBoth()
+                items = closured.get(name)
+                if items:
+                    new_set |= items
                 else:
-                    affected_defi.turn_change_toName()
-            for affected in global_process_list:
-                affected_defi = self.defs.get(affected, None)
-                if not affected_defi:
-                    continue
-                if affected in analyzed:
-                    if affected_defi.get_change_state() in (utils.constants.NAME_CHANGE, utils.constants.NO_CHANGE):
-                        affected_defi.turn_change_toNochange()
+                    new_set.add(name)
+        # a definition on a cycle is one of its own values
+        if self.is_cycle(members):
+            new_set |= component
+        return new_set
+
+    def close_with_bitsets(self, components, closured):
+        # the same rules as close_component, split into the names a component
+        # holds by itself and the components whose closure it takes in
+        comp_of = {}
+        seeds = []
+        edges = []
+        for index, members in enumerate(components):
+            for symbol in members:
+                comp_of[symbol] = index
+            seed = set()
+            succs = set()
+            for symbol in members:
+                defi = self.defs[self.symbol_manager.get_ns(symbol)]
+                if not defi.get_name_pointer().get():
+                    seed.add(symbol)
+                for name in self.get_name_ids(defi):
+                    target = comp_of.get(name)
+                    if target == index:
+                        continue
+                    if target is None:
+                        items = closured.get(name)
+                        if items:
+                            seed |= items
+                        else:
+                            seed.add(name)
+                    elif seeds[target] or edges[target]:
+                        succs.add(target)
                     else:
-                        affected_defi.turn_change_toTaint()
-                    continue
-                dfs(affected_defi)
-
-        self.pre_closured = closured
-        self.pre_reversed_closured = reversed_closured
-        return closured
-
+                        seed.add(name)
+            if self.is_cycle(members):
+                seed.update(members)
+            seeds.append(seed)
+            edges.append(succs)
+        return bitsets.close_components(seeds, edges)
+
+    @tracer.traced("transitive_taints", "closure")
     def transitive_taints(self):
-        taints = self.pre_taints
-        reversed_taints = self.pre_reversed_taints
-        CHANGED = (utils.constants.TAINT_CHANGE, utils.constants.BOTH_CHANGE)
-        global_process_list = []
-        analyzed = set()
-
-        def dfs(defi):
-            if taints.get(defi.get_ns(), None) is not None and defi.get_change_state() not in CHANGED:
-                return taints[defi.get_ns()]
-
-            if defi.get_change_state() in (utils.constants.BOTH_CHANGE, utils.constants.NAME_CHANGE):
+        # only the definitions whose taint pointer or sink flag changed since
+        # the previous call are looked at, and only the newly tainted ones
+        # are pushed further up the taint edges
+        tainted = self.tainted
+        get_id = self.symbol_manager.get_id
+        worklist = []
+        for defi in self.change_taint_defs:
+            symbol = defi.get_symbol()
+            if defi.get_change_state() == utils.constants.BOTH_CHANGE:
                 defi.turn_change_toName()
-            else:
+            elif defi.get_change_state() == utils.constants.TAINT_CHANGE:
                 defi.turn_change_toNochange()
-            analyzed.add(defi.get_ns())
-
-            taint_pointer = defi.get_taint_pointer()
-            new_set = set()
-
-            if not taint_pointer.get():
-                new_set.add(defi.get_ns())
-
-            if not taints.get(defi.get_ns()):
-                taints[defi.get_ns()] = new_set
-
-            if len(global_process_list) == 0:
-                for name in taint_pointer.get():
-                    if name.startswith('Taint-Sink-'):
-                        items = [name]
-                        new_set = set(items)
-                        break
-                    elif not self.defs.get(name, None):
-                        continue
-                    else:
-                        items = dfs(self.defs[name])
-                        if not items:
-                            items = set([name])
-                    new_set = new_set.union(items)
-            else:
-                added_taints = defi.get_added_taints()
-                full_taints = taints.get(defi.get_ns(), set())
-                remaining_taints = full_taints - added_taints
-                for name in added_taints:
-                    if name.startswith('Taint-Sink-'):
-                        items = [name]
-                        new_set = set(items)
-                        break
-                    elif not self.defs.get(name, None) or name in new_set:
-                        continue
-                    else:
-                        items = dfs(self.defs[name])
-                        if not items:
-                            items = set([name])
-                    new_set = new_set.union(items)
-                defi.clear_added_taints()
-                for name in remaining_taints:
-                    if name.startswith('Taint-Sink-'):
-                        items = [name]
-                        new_set = set(items)
-                        break
-                    elif not self.defs.get(name, None) or name in new_set or name == defi.get_ns():
-                        continue
-                    else:
-                        items = dfs(self.defs[name])
-                        if not items:
-                            items = set([name])
-                    new_set = new_set.union(items)
-
-            old_different_set = taints[defi.get_ns()] - new_set
-            new_different_set = new_set - taints[defi.get_ns()]
-            taints[defi.get_ns()] = new_set
-
-            for dep in old_different_set:
-                if dep not in reversed_taints or defi.get_ns() not in reversed_taints[dep]:
-                    continue
-                reversed_taints[dep].remove(defi.get_ns())
-
-            for dep in new_different_set:
-                if dep not in reversed_taints:
-                    reversed_taints[dep] = set()
-                reversed_taints[dep].add(defi.get_ns())
-            return taints[defi.get_ns()]
-
-        def reversed_dfs(ns, visited=None, process_list=None, depth=0, max_depth=10):
-            if visited is None:
-                visited = set()
-            if process_list is None:
-                process_list = []
-
-            if ns in visited or depth > max_depth or ns in global_process_list:
-                return
-
-            visited.add(ns)
-
-            for upstream in reversed_taints.get(ns, []):
-                reversed_dfs(upstream, visited, process_list, depth=depth + 1, max_depth=max_depth)
-
-            process_list.append(ns)
-
-            return process_list
-
-        if len(taints) == 0:
-            for ns, current_def in self.defs.items():
-                current_def.turn_change_toNochange()
-                if taints.get(ns, None) is None:
-                    dfs(current_def)
-        else:
-            for current_def in self.change_taint_defs:
-                ns = current_def.get_ns()
-                global_process_list.extend(current_def.get_added_taints())
-                if ns in global_process_list:
-                    continue
-                if current_def.get_change_state() in CHANGED or ns not in taints:
-                    global_process_list += reversed_dfs(ns)
-            self.change_taint_defs.clear()
-            global_process_list = list(dict.fromkeys(global_process_list))
-            for affected in global_process_list:
-                affected_defi = self.defs.get(affected, None)
-                if not affected_defi:
-                    continue
-                if affected_defi.get_change_state() in (utils.constants.NAME_CHANGE, utils.constants.BOTH_CHANGE):
-                    affected_defi.turn_change_Both()
-                else:
-                    affected_defi.turn_change_toTaint()
-            for affected in global_process_list:
-                affected_defi = self.defs.get(affected, None)
-                if not affected_defi:
-                    continue
-                if affected in analyzed:
-                    if affected_defi.get_change_state() in (utils.constants.TAINT_CHANGE, utils.constants.NO_CHANGE):
-                        affected_defi.turn_change_toNochange()
-                    else:
-                        affected_defi.turn_change_toName()
-                    continue
-                dfs(affected_defi)
-        self.pre_taints = taints
-        self.pre_reversed_taints = reversed_taints
-        return taints
+            if symbol in tainted:
+                continue
+            if defi.is_sink():
+                worklist.append(symbol)
+            for name in defi.get_taint_pointer().get():
+                name = get_id(name)
+                if name not in self.taint_pointed_by:
+                    self.taint_pointed_by[name] = set()
+                self.taint_pointed_by[name].add(symbol)
+                if name in tainted:
+                    worklist.append(symbol)
+        self.change_taint_defs = set()
 
+        while worklist:
+            symbol = worklist.pop()
+            if symbol in tainted:
+                continue
+            tainted.add(symbol)
+            self.mark_dependents(self.symbol_manager.get_ns(symbol), TAINT)
+            worklist.extend(self.taint_pointed_by.get(symbol, ()))
+
+        return tainted
+
+    def index_args(self, defi):
+        ns = defi.get_ns()
+        for arg in defi.get_name_pointer().get_args().values():
+            for name in arg:
+                if name not in self.arg_holders:
+                    self.arg_holders[name] = set()
+                self.arg_holders[name].add(ns)
+
+    def get_complete_worklist(self):
+        changed = self.change_complete_defs | self.created_defs
+        created = self.created_defs
+        self.change_complete_defs = set()
+        self.created_defs = set()
+
+        for ns in changed:
+            defi = self.defs.get(ns)
+            if defi:
+                self.index_name_pointer(defi)
+                self.index_args(defi)
+
+        # a definition reads the arguments of everything it points to, so
+        # whatever points to a changed definition is revisited as well
+        worklist = set()
+        for ns in changed:
+            worklist.add(ns)
+            worklist.update(self.get_pointed_by(ns))
+        # a new definition can be the target of an argument recorded earlier,
+        # the holder of that argument passes it on once it exists
+        for ns in created:
+            for holder in self.arg_holders.get(ns, ()):
+                worklist.add(holder)
+                worklist.update(self.get_pointed_by(holder))
+        return {ns for ns in worklist if ns in self.defs}
+
+    @tracer.traced("complete_definitions", "closure")
     def complete_definitions(self):
         print("execute complete_definitions (worklist version)")
 
         defs = self.defs
-        worklist = set(defs.keys())
+        worklist = self.get_complete_worklist()
         MIN_THRESHOLD = 20
         MAX_ITER = max(len(self.defs), MIN_THRESHOLD)
+        print(f"complete_definitions starts from {len(worklist)} of {len(defs)} definitions")
 
         def update_pointsto_args(pointsto_args, arg, name):
             changed_something = False
@@ -401,12 +550,10 @@ class DefinitionManager(object):
                 if pointsto_arg in arg:
                     arg.remove(pointsto_arg)
 
-                current_items = pointsto_arg_def.get()
                 for item in arg:
-                    if item not in current_items:
-                        if item in defs:
-                            changed_something = True
-                            pointsto_arg_def.add(item)
+                    if item in defs and not pointsto_arg_def.holds(item):
+                        changed_something = True
+                        pointsto_arg_def.add(item)
             return changed_something
 
         for iteration in range(MAX_ITER):
@@ -417,7 +564,8 @@ class DefinitionManager(object):
                 current_def = defs[ns]
                 current_pointer = current_def.get_name_pointer()
 
-                for name in current_pointer.get().copy():
+                # the arguments reach every target a summary stands for
+                for name in self.expand_summaries(current_pointer.get().copy(), {})[0]:
                     if name == ns or name not in defs:
                         continue
 
@@ -452,6 +600,10 @@ class DefinitionManager(object):
 
 
 class Definition(object):
+    # decorator_names is only set on decorated functions, callers test for it with hasattr
+    __slots__ = ("def_manager", "fullns", "symbol", "lit_pointer", "name_pointer", "taint_pointer", "def_type",
+                 "module_name", "change", "added_names", "sink", "decorator_names")
+
     types = [
         utils.constants.FUN_DEF,
         utils.constants.MOD_DEF,
@@ -463,12 +615,17 @@ class Definition(object):
     def __init__(self, fullns, def_type, module_name, def_manager):
         self.def_manager = def_manager
         self.fullns = fullns
-        self.points_to = {"lit": LiteralPointer(self), "name": NamePointer(self), "taint": TaintPointer(self)}
+        self.symbol = def_manager.get_symbol_manager().get_id(fullns)
+        self.lit_pointer = LiteralPointer(self)
+        self.name_pointer = NamePointer(self)
+        self.taint_pointer = TaintPointer(self)
         self.def_type = def_type
         self.module_name = module_name
         self.change = utils.constants.NO_CHANGE
-        self.added_names = set()
-        self.added_taints = set()
+        # only definitions changed since the last closure allocate this
+        self.added_names = EMPTY_VALUES
+        # set on the arguments that flow into a sink
+        self.sink = False
 
     def get_def_manager(self):
         return self.def_manager
@@ -476,20 +633,21 @@ class Definition(object):
     def get_added_names(self):
         return self.added_names
 
-    def get_added_taints(self):
-        return self.added_taints
-
     def add_added_names(self, added_name):
+        if not self.added_names:
+            self.added_names = set()
         self.added_names.add(added_name)
 
-    def add_added_taints(self, added_taint):
-        self.added_taints.add(added_taint)
-
     def clear_added_names(self):
-        self.added_names.clear()
+        self.added_names = EMPTY_VALUES
 
-    def clear_added_taints(self):
-        self.added_taints.clear()
+    def is_sink(self):
+        return self.sink
+
+    def mark_sink(self):
+        if not self.sink:
+            self.sink = True
+            self.def_manager.add_change_taint_defs(self)
 
     def get_change_state(self):
         return self.change
@@ -510,6 +668,8 @@ class Definition(object):
         return self.def_type
 
     def set_type(self, def_type):
+        if def_type != self.def_type:
+            self.def_manager.mark_dependents(self.fullns)
         self.def_type = def_type
 
     def is_function_def(self):
@@ -522,13 +682,13 @@ class Definition(object):
         return self.is_function_def() or self.is_ext_def()
 
     def get_lit_pointer(self):
-        return self.points_to["lit"]
+        return self.lit_pointer
 
     def get_name_pointer(self):
-        return self.points_to["name"]
+        return self.name_pointer
 
     def get_taint_pointer(self):
-        return self.points_to["taint"]
+        return self.taint_pointer
 
     def get_name(self):
         return self.fullns.split(".")[-1]
@@ -536,9 +696,15 @@ class Definition(object):
     def get_ns(self):
         return self.fullns
 
+    def get_symbol(self):
+        return self.symbol
+
     def merge(self, to_merge):
-        for name, pointer in to_merge.points_to.items():
-            self.points_to[name].merge(pointer)
+        self.lit_pointer.merge(to_merge.lit_pointer)
+        self.name_pointer.merge(to_merge.name_pointer)
+        self.taint_pointer.merge(to_merge.taint_pointer)
+        if to_merge.is_sink():
+            self.mark_sink()
 
     def get_module_name(self):
         return self.module_name
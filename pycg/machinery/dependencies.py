@@ -0,0 +1,134 @@
+# kinds of state a post processing unit reads, every kind has its own keys
+DEFINITION = 0
+SCOPE = 1
+CLASS = 2
+CLOSURE = 3
+TAINT = 4
+KINDS = 5
+
+
+class DependencyManager(object):
+    """
+    Remembers what every function (and module) read the last time the post
+    processor visited it, so that a later iteration can skip the units none
+    of whose inputs changed since. Definitions, scopes, classes, closure
+    entries and taints are tracked per key. The state of the sink, middle and
+    module managers is only compared as a whole through get_signature.
+    """
+
+    def __init__(self, get_signature=None):
+        self.clock = 0
+        self.stamps = tuple({} for _ in range(KINDS))
+        # last change of the state that is not tracked per key
+        self.external_stamp = 0
+        self.get_signature = get_signature
+        self.signature = get_signature() if get_signature else None
+        self.records = {}
+        self.frames = []
+        self.visited = 0
+        self.skipped = 0
+
+    def mark_changed(self, kind, key):
+        self.clock += 1
+        self.stamps[kind][key] = self.clock
+
+    def mark_read(self, kind, key):
+        if self.frames:
+            self.frames[-1].reads[kind].add(key)
+
+    def mark_external_changed(self):
+        self.clock += 1
+        self.external_stamp = self.clock
+
+    def check_external(self):
+        if not self.get_signature:
+            self.mark_external_changed()
+            return
+        signature = self.get_signature()
+        if signature != self.signature:
+            self.signature = signature
+            self.mark_external_changed()
+
+    def mark_volatile(self):
+        # the unit had effects a skipped visit would not repeat
+        for frame in self.frames:
+            frame.volatile = True
+
+    def is_clean(self, unit, entry):
+        record = self.records.get(unit)
+        if not record or record.volatile or record.entry != entry or self.external_stamp > record.start:
+            return False
+        start = record.start
+        for stamps, reads in zip(self.stamps, record.reads):
+            for key in reads:
+                if stamps.get(key, 0) > start:
+                    return False
+        return True
+
+    def skip(self, unit):
+        # the enclosing unit still depends on what the skipped one read
+        record = self.records[unit]
+        if self.frames:
+            self.frames[-1].merge(record)
+        self.skipped += 1
+        return record.exit
+
+    def begin(self, entry):
+        self.frames.append(Frame(self.clock, entry))
+
+    def end(self, unit, exit):
+        frame = self.frames.pop()
+        frame.exit = exit
+        self.records[unit] = frame
+        if self.frames:
+            self.frames[-1].merge(frame)
+        self.visited += 1
+
+    def get_counts(self):
+        return self.visited, self.skipped
+
+    def reset_counts(self):
+        self.visited = 0
+        self.skipped = 0
+
+
+class Frame(object):
+    __slots__ = ("start", "reads", "volatile", "entry", "exit")
+
+    def __init__(self, start, entry):
+        self.start = start
+        self.reads = tuple(set() for _ in range(KINDS))
+        self.volatile = False
+        self.entry = entry
+        self.exit = None
+
+    def merge(self, other):
+        for reads, other_reads in zip(self.reads, other.reads):
+            reads |= other_reads
+        self.volatile = self.volatile or other.volatile
+
+
+class WatchedMap(object):
+    """Read-only view of the closure or the taints that records every key looked up"""
+
+    __slots__ = ("values", "kind", "dependency_manager")
+
+    def __init__(self, values, kind, dependency_manager):
+        self.values = values
+        self.kind = kind
+        self.dependency_manager = dependency_manager
+
+    def get(self, key, default=None):
+        self.dependency_manager.mark_read(self.kind, key)
+        return self.values.get(key, default)
+
+    def __getitem__(self, key):
+        self.dependency_manager.mark_read(self.kind, key)
+        return self.values[key]
+
+    def __contains__(self, key):
+        self.dependency_manager.mark_read(self.kind, key)
+        return key in self.values
+
+    def __len__(self):
+        return len(self.values)
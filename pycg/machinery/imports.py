@@ -18,41 +18,101 @@
 # specific language governing permissions and limitations
 # under the License.
 #
-import copy
-import importlib
 import importlib.machinery
 import importlib.util
 import os
 import sys
-from importlib import abc
 
 from pycg import utils
+from pycg.machinery.reachability import ReachabilityIndex
 
 
-def get_custom_loader(ig_obj):
+class ModuleResolver(object):
     """
-    Closure which returns a custom loader
-    that modifies an ImportManager object
+    Finds the file of a module by listing the directories of the search
+    path, without importing anything or touching the interpreter import state
     """
 
-    class CustomLoader(abc.SourceLoader):
-        def __init__(self, fullname, path):
-            self.fullname = fullname
-            self.path = path
-
-            ig_obj.create_edge(self.fullname)
-            if not ig_obj.get_node(self.fullname):
-                sub_node = ig_obj.create_node(self.fullname)
-                ig_obj.set_filepath(self.fullname, self.path)
-                ig_obj.create_reverse_edge(sub_node)
-
-        def get_filename(self, fullname):
-            return self.path
-
-        def get_data(self, filename):
-            return ""
-
-    return CustomLoader
+    # same order as the suffixes the path based finder tries
+    SUFFIXES = importlib.machinery.all_suffixes()
+
+    def __init__(self, search_path):
+        self.search_path = []
+        for directory in search_path:
+            directory = os.path.abspath(directory or os.curdir)
+            if directory not in self.search_path:
+                self.search_path.append(directory)
+        self.listings = {}
+        self.specs = {}
+
+    def _list_dir(self, directory):
+        if directory not in self.listings:
+            dirs = set()
+            files = set()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                dirs.add(entry.name)
+                            else:
+                                files.add(entry.name)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            self.listings[directory] = (dirs, files)
+        return self.listings[directory]
+
+    def _find_file(self, directory, name):
+        files = self._list_dir(directory)[1]
+        for suffix in self.SUFFIXES:
+            if name + suffix in files:
+                return os.path.join(directory, name + suffix)
+
+    def _find_in(self, directory, name):
+        # a regular package wins over a module, which wins over a namespace package
+        dirs = self._list_dir(directory)[0]
+        if name in dirs:
+            pkg_dir = os.path.join(directory, name)
+            init_file = self._find_file(pkg_dir, "__init__")
+            if init_file:
+                return init_file, [pkg_dir]
+        mod_file = self._find_file(directory, name)
+        if mod_file:
+            return mod_file, []
+        if name in dirs:
+            return None, [os.path.join(directory, name)]
+
+    def find(self, fullname):
+        """
+        Returns a (filename, search directories) pair for the module, None if it
+        can't be found. Namespace packages have no filename and modules that are
+        not packages have no search directories.
+        """
+        if fullname not in self.specs:
+            parent, _, name = fullname.rpartition(".")
+            spec = None
+            if name:
+                if parent:
+                    parent_spec = self.find(parent)
+                    directories = parent_spec[1] if parent_spec else []
+                else:
+                    directories = self.search_path
+
+                portions = []
+                for directory in directories:
+                    found = self._find_in(directory, name)
+                    if not found:
+                        continue
+                    if found[0]:
+                        spec = found
+                        break
+                    portions.extend(found[1])
+                if not spec and portions:
+                    spec = (None, portions)
+            self.specs[fullname] = spec
+        return self.specs[fullname]
 
 
 class ImportManager(object):
@@ -61,11 +121,16 @@ class ImportManager(object):
         self.current_module = ""
         self.input_file = ""
         self.mod_dir = None
-        self.old_path_hooks = None
-        self.old_path = None
+        self.resolver = None
+        self.resolvers = {}
+        self.import_tree = ReachabilityIndex()
 
     def set_pkg(self, input_pkg):
         self.mod_dir = input_pkg
+        # the analyzed package shadows everything else on the path
+        if input_pkg not in self.resolvers:
+            self.resolvers[input_pkg] = ModuleResolver([input_pkg] + sys.path)
+        self.resolver = self.resolvers[input_pkg]
 
     def get_mod_dir(self):
         return self.mod_dir
@@ -82,7 +147,7 @@ class ImportManager(object):
             raise ImportManagerError("Can't create a node a second time")
 
         self.import_graph[name] = {"filename": "", "imports": set(), "reverse_imports": set(), "imports_nodes": dict(),
-                                   "sink_imports": dict(), "method_imports": dict(), "import_tree": set()}
+                                   "sink_imports": dict(), "method_imports": dict()}
         return self.import_graph[name]
 
     def create_edge(self, dest):
@@ -105,6 +170,13 @@ class ImportManager(object):
 
         node["reverse_imports"].add(dest)
 
+    def create_tree_edge(self, dest):
+        self.import_tree.add_edge(self._get_module_path(), dest)
+
+    def in_import_tree(self, modname, target):
+        # whether modname transitively imports target
+        return self.import_tree.reaches(modname, target)
+
     def create_sink_edge(self, part_name, dest):
         if not part_name or not isinstance(part_name, str):
             raise ImportManagerError("Invalid node name")
@@ -121,21 +193,6 @@ class ImportManager(object):
         else:
             node["sink_imports"][part_name] = {dest}
 
-    def invalidate_all_caches(self):
-        for path in sys.path:
-            finder = importlib.machinery.PathFinder.find_spec(path)
-            if finder and hasattr(finder, "invalidate_caches"):
-                finder.invalidate_caches()
-
-    def _clear_caches(self):
-        self.invalidate_all_caches()
-        # importlib.invalidate_caches()
-        sys.path_importer_cache.clear()
-        # TODO: maybe not do that since it empties the whole cache
-        for name in self.import_graph:
-            if name in sys.modules:
-                del sys.modules[name]
-
     def _get_module_path(self):
         return self.current_module
 
@@ -185,21 +242,28 @@ class ImportManager(object):
 
         return mod_name, ".".join(package)
 
-    def _do_import(self, mod_name, package):
-        if mod_name in sys.modules:
-            self.create_edge(mod_name)
-            self.create_reverse_edge(self.get_node(mod_name))
-            return sys.modules[mod_name]
-
-        try:
-            module_spec = importlib.util.find_spec(mod_name, package=package)
-        except ModuleNotFoundError:
-            module_spec = None
-
-        if module_spec is None:
-            return importlib.import_module(mod_name, package=package)
+    def _add_import(self, mod_name, filename):
+        self.create_edge(mod_name)
+        node = self.get_node(mod_name)
+        if not node:
+            node = self.create_node(mod_name)
+            self.set_filepath(mod_name, filename)
+        self.create_reverse_edge(node)
 
-        return importlib.util.module_from_spec(module_spec)
+    def _do_import(self, mod_name, package):
+        mod_name = importlib.util.resolve_name(mod_name, package)
+        spec = self.resolver.find(mod_name)
+        if not spec:
+            return None
+
+        # importing a submodule imports every package above it
+        parts = mod_name.split(".")
+        for index in range(1, len(parts) + 1):
+            name = ".".join(parts[:index])
+            filename = self.resolver.find(name)[0]
+            if filename:
+                self._add_import(name, filename)
+        return spec
 
     def handle_import_from_graph(self, name, level):
         root = name.split(".")[0]
@@ -249,22 +313,23 @@ class ImportManager(object):
             (utils.join_ns(package, parent_name), ""),
         ]
 
-        mod = None
+        spec = None
         for mn, pkg in combos:
             try:
-                mod = self._do_import(mn, pkg)  # 查找引入的模块
-                break
+                spec = self._do_import(mn, pkg)  # 查找引入的模块
             except Exception:
                 continue
+            if spec:
+                break
 
-        if not mod:
+        if not spec:
             return
 
-        if not hasattr(mod, "__file__") or not mod.__file__:
+        fname = spec[0]
+        if not fname:
             return
-        if self.mod_dir not in mod.__file__:
+        if self.mod_dir not in fname:
             return
-        fname = mod.__file__
         if fname.endswith("__init__.py"):
             fname = os.path.split(fname)[0]
 
@@ -273,25 +338,6 @@ class ImportManager(object):
     def get_import_graph(self):
         return self.import_graph
 
-    def install_hooks(self):
-        loader = get_custom_loader(self)
-        self.old_path_hooks = copy.deepcopy(sys.path_hooks)
-        self.old_path = copy.deepcopy(sys.path)
-
-        loader_details = loader, importlib.machinery.all_suffixes()  # 2-tuple
-        sys.path_hooks.insert(
-            0, importlib.machinery.FileFinder.path_hook(loader_details)
-        )
-        sys.path.insert(0, os.path.abspath(self.mod_dir))
-
-        self._clear_caches()
-
-    def remove_hooks(self):
-        sys.path_hooks = self.old_path_hooks
-        sys.path = self.old_path
-
-        self._clear_caches()
-
 
 class ImportManagerError(Exception):
     pass
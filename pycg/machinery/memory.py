@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# number of allocation sites kept per phase
+TOP_SITES = 15
+
+
+class MemoryManager(object):
+    """Records the memory held by a run at every phase boundary"""
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = []
+        self.top_sites = TOP_SITES
+
+    def enable(self, top_sites=TOP_SITES):
+        self.enabled = True
+        self.phases = []
+        self.top_sites = top_sites
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def is_enabled(self):
+        return self.enabled
+
+    def get_rss(self):
+        # current resident set size, only known where /proc is available
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def get_peak_rss(self):
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def get_top_sites(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        sites = []
+        for stat in snapshot.statistics("lineno")[:self.top_sites]:
+            frame = stat.traceback[0]
+            sites.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "size": stat.size,
+                "count": stat.count,
+            })
+        return sites
+
+    def record(self, phase, get_counts=None, **args):
+        # the counts walk every manager, so they are only taken when enabled
+        if not self.enabled:
+            return
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        self.phases.append({
+            "phase": phase,
+            "time": time.time(),
+            "rss": self.get_rss(),
+            "peak_rss": self.get_peak_rss(),
+            "traced": traced,
+            # peak of the python heap since the previous phase boundary
+            "traced_peak": traced_peak,
+            "top_sites": self.get_top_sites(),
+            "counts": get_counts() if get_counts else {},
+            "args": args,
+        })
+        tracemalloc.reset_peak()
+
+    def write(self, path):
+        report = {
+            "peak_rss": self.get_peak_rss(),
+            "phases": self.phases,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+# shared by every run of the process, disabled unless --memory-report is given
+memory_profiler = MemoryManager()
@@ -45,6 +45,9 @@ class ModuleManager:
 
 
 class Module:
+    __slots__ = ("name", "filename", "classes", "methods", "fields", "field_to_cls_name", "classes_and_methods",
+                 "module_methods", "abstract_methods", "caller_messages", "method_messages")
+
     def __init__(self, name, filename):
         self.name = name
         self.filename = filename
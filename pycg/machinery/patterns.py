@@ -0,0 +1,84 @@
+import re
+
+from pycg.utils.constants import BUILTIN_NAME
+
+# above this many literals one compiled alternation is cheaper than a
+# substring search per literal
+REGEX_THRESHOLD = 16
+
+
+class PatternMatcher(object):
+    """Classifies source files against the sink and middle catalogs"""
+
+    def __init__(self, sink_points, middle_methods):
+        sink_patterns = set()
+        self.sink_modules = set()
+        self.builtin_sinks = set()
+        for sink_point in sink_points:
+            if not sink_point:
+                continue
+            sink_module, sink_name, param_index = sink_point.split(":")
+            sink_patterns.add(sink_name + "(")
+            sink_patterns.add(sink_module)
+            if sink_module == BUILTIN_NAME:
+                self.builtin_sinks.add(sink_name)
+            else:
+                self.sink_modules.add(sink_module)
+
+        # any sink literal is enough, so a literal that contains another one
+        # can never decide a file on its own
+        self.sink_patterns = tuple(sorted(
+            (p for p in sink_patterns
+             if not any(other != p and other in p for other in sink_patterns)),
+            key=lambda p: (len(p), p),
+        ))
+        self.sink_regex = None
+        if len(self.sink_patterns) > REGEX_THRESHOLD:
+            self.sink_regex = re.compile("|".join(re.escape(p) for p in self.sink_patterns))
+
+        # a middle method needs both its module import and a call to its name
+        middle_rules = set()
+        for middle_point in middle_methods:
+            if not middle_point:
+                continue
+            middle_module, middle_name, param_index = middle_point.split(":")
+            middle_rules.add((middle_module, middle_name))
+        self.middle_rules = tuple(sorted(middle_rules))
+
+    def is_sink(self, content):
+        if self.sink_regex is not None:
+            return self.sink_regex.search(content) is not None
+        for pattern in self.sink_patterns:
+            if pattern in content:
+                return True
+        return False
+
+    def is_middle(self, content):
+        for middle_module, middle_name in self.middle_rules:
+            if middle_name + "(" in content and any(
+                    prefix + middle_module in content for prefix in ("import ", "from ")):
+                return True
+        return False
+
+    def classify(self, content, names=None):
+        # without the imported and called names the textual prefilter decides
+        if names is None:
+            return self.is_sink(content), self.is_middle(content)
+
+        imported, called = names
+
+        is_sink = not called.isdisjoint(self.builtin_sinks) or any(
+            self._is_imported(sink_module, imported) for sink_module in self.sink_modules
+        )
+        is_middle = any(
+            middle_name in called and self._is_imported(middle_module, imported)
+            for middle_module, middle_name in self.middle_rules
+        )
+        return is_sink, is_middle
+
+    def _is_imported(self, module, imported):
+        if module in imported:
+            return True
+        # imports of a submodule also bring in the module itself
+        prefix = module + "."
+        return any(name.startswith(prefix) for name in imported)
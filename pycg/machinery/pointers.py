@@ -19,19 +19,44 @@
 # under the License.
 #
 import ast
+import sys
+import types
+import zlib
 
 from pycg import utils
 
+# shared by every pointer that holds nothing yet, replaced by a real
+# container on the first write so empty pointers cost no allocation
+EMPTY_VALUES = frozenset()
+EMPTY_ARGS = types.MappingProxyType({})
+
+# longer strings are kept as a prefix, their length and a checksum
+MAX_LITERAL_LENGTH = 64
+LITERAL_PREFIX = 16
+# past this many distinct literals a definition only knows their kinds
+MAX_LITERALS = 64
+
+
+def get_literal(item):
+    # the value a string literal is stored and matched as, dict keys and
+    # subscripts go through here as well so they keep matching
+    if isinstance(item, str) and len(item) > MAX_LITERAL_LENGTH:
+        checksum = zlib.crc32(item.encode("utf-8", "surrogatepass"))
+        # no dot, the result may end up as the last part of a namespace
+        item = f"{item[:LITERAL_PREFIX].replace('.', '_')}~{len(item)}:{checksum:08x}"
+    return item
+
 
 class Pointer(object):
+    __slots__ = ("owner", "values")
+
     def __init__(self, owner = None):
         self.owner = owner
-        self.values = set()
+        self.values = EMPTY_VALUES
 
     def change_defi(self, item):
         if self.owner.get_change_state() != utils.constants.BOTH_CHANGE and item not in self.values:
             if isinstance(self, TaintPointer):
-                self.owner.add_added_taints(item)
                 self.owner.get_def_manager().add_change_taint_defs(self.owner)
                 if  self.owner.get_change_state() == utils.constants.NAME_CHANGE:
                     self.owner.turn_change_toBoth()
@@ -45,49 +70,108 @@ class Pointer(object):
                 else:
                     self.owner.turn_change_toName()
 
+    def mark_changed(self):
+        # taints are not part of the state the post processing converges on
+        if self.owner and not isinstance(self, TaintPointer):
+            self.owner.get_def_manager().mark_changed(self.owner.get_ns())
+
     def add(self, item):
         if not item:
             return
+        if isinstance(item, str):
+            item = sys.intern(item)
+        if item not in self.values:
+            self.mark_changed()
         self.change_defi(item)
+        if not self.values:
+            self.values = set()
         self.values.add(item)
 
     def add_set(self, s):
+        changed = False
         for value in s:
             if value not in self.values:
+                changed = True
                 self.change_defi(value)
-        self.values = self.values.union(s)
+        if changed:
+            self.mark_changed()
+        if self.values:
+            self.values = self.values.union(s)
+        elif s:
+            self.values = set(s)
 
     def get(self):
         return self.values
 
     def merge(self, pointer):
+        changed = False
         for value in pointer.values:
             if value not in self.values:
+                changed = True
                 self.change_defi(value)
-        self.values = self.values.union(pointer.values)
+        if changed:
+            self.mark_changed()
+        if self.values:
+            self.values = self.values.union(pointer.values)
+        elif pointer.values:
+            self.values = set(pointer.values)
 
 
 class LiteralPointer(Pointer):
+    __slots__ = ()
+
     STR_LIT = "STRING"
     INT_LIT = "INTEGER"
     UNK_LIT = "UNKNOWN"
+    # a collapsed set holds these instead of its values, so each of them
+    # may be any value of its kind
+    WILDCARDS = (STR_LIT, INT_LIT)
 
-    # no need to add the actual item
     def add(self, item):
-        if isinstance(item, str):
+        item = self.get_abstract(item)
+        if item not in self.values:
+            self.mark_changed()
+            if not self.values:
+                self.values = set()
             self.values.add(item)
-        elif isinstance(item, int):
-            self.values.add(item)
-        else:
-            self.values.add(self.UNK_LIT)
+            if len(self.values) > MAX_LITERALS:
+                self.values = {self.get_kind(value) for value in self.values}
+
+    def add_set(self, s):
+        for item in s:
+            self.add(item)
+
+    def merge(self, pointer):
+        self.add_set(pointer.values)
+
+    def get_abstract(self, item):
+        # STRING and INTEGER stand for every value of their kind, so a
+        # collapsed set stays collapsed
+        if item in (self.STR_LIT, self.INT_LIT, self.UNK_LIT):
+            return item
+        if isinstance(item, str):
+            if self.STR_LIT in self.values:
+                return self.STR_LIT
+            return sys.intern(get_literal(item))
+        if isinstance(item, int):
+            return self.INT_LIT if self.INT_LIT in self.values else item
+        return self.UNK_LIT
+
+    def get_kind(self, item):
+        if item in (self.STR_LIT, self.INT_LIT, self.UNK_LIT):
+            return item
+        return self.STR_LIT if isinstance(item, str) else self.INT_LIT
 
 
 class NamePointer(Pointer):
+    # the argument maps stay None until a call site records an argument
+    __slots__ = ("pos_to_name", "name_to_pos", "args")
+
     def __init__(self, owner=None):
         super().__init__(owner)
-        self.pos_to_name = {}
-        self.name_to_pos = {}
-        self.args = {}
+        self.pos_to_name = None
+        self.name_to_pos = None
+        self.args = None
 
     def _sanitize_pos(self, pos):
         try:
@@ -97,38 +181,116 @@ class NamePointer(Pointer):
 
         return pos
 
+    def mark_changed(self):
+        super().mark_changed()
+        self.mark_args_changed()
+
+    def get_widening_manager(self):
+        # the definition manager, when it caps the size of the points-to sets
+        if self.owner:
+            def_manager = self.owner.get_def_manager()
+            if def_manager.get_max_points_to() is not None:
+                return def_manager
+
+    def add(self, item):
+        def_manager = self.get_widening_manager()
+        if def_manager and item and def_manager.is_widened(self.owner.get_ns()):
+            item = def_manager.summarize(item)
+        super().add(item)
+        if def_manager:
+            self.check_size(def_manager)
+
+    def add_set(self, s):
+        def_manager = self.get_widening_manager()
+        if def_manager and def_manager.is_widened(self.owner.get_ns()):
+            s = {def_manager.summarize(value) for value in s}
+        super().add_set(s)
+        if def_manager:
+            self.check_size(def_manager)
+
+    def holds(self, item):
+        # a widened set holds item through the summary that replaced it
+        if item in self.values:
+            return True
+        def_manager = self.get_widening_manager()
+        if def_manager and def_manager.is_widened(self.owner.get_ns()):
+            return def_manager.get_summary_of(item) in self.values
+        return False
+
+    def check_size(self, def_manager):
+        if len(self.values) > def_manager.get_max_points_to() and not def_manager.is_widened(self.owner.get_ns()):
+            self.widen(def_manager)
+
+    def widen(self, def_manager):
+        # every target is replaced by the summary of the class or module holding it
+        def_manager.add_widened(self.owner.get_ns(), len(self.values))
+        summary = {def_manager.summarize(value) for value in self.values}
+        for value in summary:
+            if value not in self.values:
+                self.change_defi(value)
+        # the set may only have shrunk, its closure is recomputed either way
+        def_manager.add_change_named_defs(self.owner)
+        self.values = summary
+        self.mark_changed()
+
+    def mark_args_changed(self):
+        # complete_definitions revisits the owner and whatever points to it,
+        # and the post processor units that read the arguments are revisited
+        if self.owner:
+            def_manager = self.owner.get_def_manager()
+            def_manager.add_change_complete_defs(self.owner)
+            def_manager.mark_dependents(self.owner.get_ns())
+
     def get_or_create(self, name):
+        if self.args is None:
+            self.args = {}
         if name not in self.args:
             self.args[name] = set()
+            self.mark_args_changed()
         return self.args[name]
 
     def add_arg(self, name, item):
-        self.get_or_create(name)
+        arg = self.get_or_create(name)
         if isinstance(item, str):
-            self.args[name].add(item)
+            if item not in arg:
+                self.mark_args_changed()
+            arg.add(item)
         elif isinstance(item, set):
-            self.args[name] = self.args[name].union(item)
+            if not item <= arg:
+                self.mark_args_changed()
+            self.args[name] = arg.union(item)
         else:
             raise Exception()
 
     def add_lit_arg(self, name, item):
         arg = self.get_or_create(name)
         if isinstance(item, str):
-            arg.add(LiteralPointer.STR_LIT)
+            item = LiteralPointer.STR_LIT
         elif isinstance(item, int):
-            arg.add(LiteralPointer.INT_LIT)
+            item = LiteralPointer.INT_LIT
         else:
-            arg.add(LiteralPointer.UNK_LIT)
+            item = LiteralPointer.UNK_LIT
+        if item not in arg:
+            self.mark_args_changed()
+            arg.add(item)
+
+    def set_pos_name(self, pos, name):
+        if self.pos_to_name is None:
+            self.pos_to_name = {}
+            self.name_to_pos = {}
+        if self.pos_to_name.get(pos) != name or self.name_to_pos.get(name) != pos:
+            self.mark_args_changed()
+        self.pos_to_name[pos] = name
+        self.name_to_pos[name] = pos
 
     def add_pos_arg(self, pos, name, item):
         pos = self._sanitize_pos(pos)
         if not name:
-            if self.pos_to_name.get(pos, None):
+            if self.get_pos_names().get(pos, None):
                 name = self.pos_to_name[pos]
             else:
                 name = str(pos)
-        self.pos_to_name[pos] = name
-        self.name_to_pos[name] = pos
+        self.set_pos_name(pos, name)
 
         self.add_arg(name, item)
 
@@ -139,45 +301,54 @@ class NamePointer(Pointer):
         pos = self._sanitize_pos(pos)
         if not name:
             name = str(pos)
-        self.pos_to_name[pos] = name
-        self.name_to_pos[name] = pos
+        self.set_pos_name(pos, name)
         self.add_lit_arg(name, item)
 
     def get_pos_arg(self, pos):
         pos = self._sanitize_pos(pos)
-        name = self.pos_to_name.get(pos, None)
+        name = self.get_pos_names().get(pos, None)
         return self.get_arg(name)
 
     def get_arg(self, name):
-        if self.args.get(name, None):
+        if self.get_args().get(name, None):
             return self.args[name]
 
     def get_args(self):
-        return self.args
+        return self.args if self.args is not None else EMPTY_ARGS
 
     def get_pos_args(self):
         args = {}
-        for pos, name in self.pos_to_name.items():
+        for pos, name in self.get_pos_names().items():
             args[pos] = self.args[name]
         return args
 
     def get_pos_of_name(self, name):
-        if name in self.name_to_pos:
+        if self.name_to_pos is not None and name in self.name_to_pos:
             return self.name_to_pos[name]
 
     def get_pos_names(self):
-        return self.pos_to_name
+        return self.pos_to_name if self.pos_to_name is not None else EMPTY_ARGS
 
     def merge(self, pointer):
-        super().merge(pointer)
+        if self.get_widening_manager():
+            self.add_set(pointer.values)
+        else:
+            super().merge(pointer)
         if hasattr(pointer, "get_pos_names"):
             for pos, name in pointer.get_pos_names().items():
+                if self.pos_to_name is None:
+                    self.pos_to_name = {}
+                    self.name_to_pos = {}
+                if self.pos_to_name.get(pos) != name:
+                    self.mark_args_changed()
                 self.pos_to_name[pos] = name
             for name, arg in pointer.get_args().items():
                 self.add_arg(name, arg)
 
 
 class TaintPointer(Pointer):
+    __slots__ = ()
+
     def __init__(self, owner=None):
         super().__init__(owner)
 
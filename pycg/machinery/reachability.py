@@ -0,0 +1,95 @@
+class ReachabilityIndex(object):
+    """
+    Answers whether a node reaches another one in a graph that only grows.
+    Every node keeps the nodes it reaches as a bitset, so a query is a shift
+    and a mask. Adding an edge pushes the bits the source gains back through
+    its predecessors, stopping at the ones that already had them, so the
+    index is never rebuilt.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.edges = []
+        self.preds = []
+        self.reach = []
+
+    def _get_id(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.edges)
+            self.edges.append(set())
+            self.preds.append(set())
+            self.reach.append(0)
+        return self.ids[name]
+
+    def add_edge(self, src, dest):
+        src_id = self._get_id(src)
+        dest_id = self._get_id(dest)
+        if dest_id in self.edges[src_id]:
+            return
+        self.edges[src_id].add(dest_id)
+        self.preds[dest_id].add(src_id)
+
+        reach = self.reach
+        stack = [(src_id, reach[dest_id] | (1 << dest_id))]
+        while stack:
+            node, bits = stack.pop()
+            added = bits & ~reach[node]
+            if not added:
+                continue
+            reach[node] |= added
+            for pred in self.preds[node]:
+                stack.append((pred, added))
+
+    def reaches(self, src, dest):
+        if src not in self.ids or dest not in self.ids:
+            return False
+        return (self.reach[self.ids[src]] >> self.ids[dest]) & 1 == 1
+
+
+def iter_components(roots, get_successors):
+    """
+    Yields the strongly connected components reachable from roots as lists of
+    nodes, using an iterative Tarjan so deep graphs do not hit the recursion
+    limit. Components come out in reverse topological order: every component
+    a node reaches is yielded before the component of the node itself.
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+
+    for root in roots:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(get_successors(root)))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(get_successors(succ))))
+                    break
+                if succ in on_stack and index[succ] < lowlink[node]:
+                    lowlink[node] = index[succ]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] != index[node]:
+                    continue
+
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                yield members
@@ -21,43 +21,85 @@
 import symtable
 
 from pycg import utils
+from pycg.machinery.dependencies import DEFINITION, SCOPE
 
 
 class ScopeManager(object):
     """Manages the scope entries"""
 
-    def __init__(self):
+    def __init__(self, parse_cache=None):
         self.scopes = {}
+        self.parse_cache = parse_cache
+        # bumped whenever a scope is created or a name is bound to another definition
+        self.epoch = 0
+        self.dependency_manager = None
 
-    def handle_module(self, modulename, filename, contents):
-        functions = []
-        classes = []
+    def get_epoch(self):
+        return self.epoch
+
+    def inc_epoch(self):
+        self.epoch += 1
+
+    def set_dependency_manager(self, dependency_manager):
+        self.dependency_manager = dependency_manager
+
+    def mark_changed(self, namespace):
+        self.inc_epoch()
+        if self.dependency_manager:
+            self.dependency_manager.mark_changed(SCOPE, namespace)
 
-        def process(namespace, parent, table):
+    def mark_read(self, kind, key):
+        if self.dependency_manager:
+            self.dependency_manager.mark_read(kind, key)
+
+    def _list_scopes(self, filename, contents):
+        # each entry holds the namespace suffix relative to the module,
+        # the index of the parent entry and the symbol table type
+        entries = []
+
+        def process(suffix, parent, table):
             if table.get_name() == "top" and table.get_lineno() == 0:
                 name = ""
             else:
                 name = table.get_name()
 
             if name:
-                fullns = utils.join_ns(namespace, name)
-            else:
-                fullns = namespace
+                suffix = utils.join_ns(suffix, name)
+
+            idx = len(entries)
+            entries.append((suffix, parent, str(table.get_type())))
+
+            for t in table.get_children():
+                process(suffix, idx, t)
 
-            if table.get_type() == "function":
+        process("", None, symtable.symtable(contents, filename, compile_type="exec"))
+        return entries
+
+    def handle_module(self, modulename, filename, contents):
+        functions = []
+        classes = []
+
+        entries = None
+        if self.parse_cache:
+            entries = self.parse_cache.load(contents, "scopes")
+        if entries is None:
+            entries = self._list_scopes(filename, contents)
+            if self.parse_cache:
+                self.parse_cache.store(contents, "scopes", entries)
+
+        created = []
+        for suffix, parent, table_type in entries:
+            fullns = modulename + suffix
+
+            if table_type == "function":
                 functions.append(fullns)
 
-            if table.get_type() == "class":
+            if table_type == "class":
                 classes.append(fullns)
 
-            sc = self.create_scope(fullns, parent)
-
-            for t in table.get_children():
-                process(fullns, sc, t)
+            parent_sc = created[parent] if parent is not None else None
+            created.append(self.create_scope(fullns, parent_sc))
 
-        process(
-            modulename, None, symtable.symtable(contents, filename, compile_type="exec")
-        )
         return {"functions": functions, "classes": classes}
 
     def handle_assign(self, ns, target, defi):
@@ -74,13 +116,15 @@ class ScopeManager(object):
             current_scope = current_scope.parent
 
     def get_scope(self, namespace):
+        self.mark_read(SCOPE, namespace)
         if namespace in self.get_scopes():
             return self.get_scopes()[namespace]
 
     def create_scope(self, namespace, parent):
         if namespace not in self.scopes:
-            sc = ScopeItem(namespace, parent)
+            sc = ScopeItem(namespace, parent, self)
             self.scopes[namespace] = sc
+            self.mark_changed(namespace)
         return self.scopes[namespace]
 
     def get_scopes(self):
@@ -88,7 +132,9 @@ class ScopeManager(object):
 
 
 class ScopeItem(object):
-    def __init__(self, fullns, parent):
+    __slots__ = ("parent", "defs", "lambda_counter", "dict_counter", "list_counter", "fullns", "scope_manager")
+
+    def __init__(self, fullns, parent, scope_manager=None):
         if parent and not isinstance(parent, ScopeItem):
             raise ScopeError("Parent must be a ScopeItem instance")
 
@@ -101,16 +147,21 @@ class ScopeItem(object):
         self.dict_counter = 0
         self.list_counter = 0
         self.fullns = fullns
+        self.scope_manager = scope_manager
 
     def get_ns(self):
         return self.fullns
 
     def get_defs(self):
+        if self.scope_manager:
+            self.scope_manager.mark_read(SCOPE, self.fullns)
         return self.defs
 
     def get_def(self, name):
         defs = self.get_defs()
         if name in defs:
+            if self.scope_manager:
+                self.scope_manager.mark_read(DEFINITION, defs[name].get_ns())
             return defs[name]
 
     def get_lambda_counter(self):
@@ -139,11 +190,18 @@ class ScopeItem(object):
         self.dict_counter = 0
         self.list_counter = 0
 
+    def mark_changed(self, name, defi):
+        old = self.defs.get(name)
+        if self.scope_manager and (not old or old.get_ns() != defi.get_ns()):
+            self.scope_manager.mark_changed(self.fullns)
+
     def add_def(self, name, defi):
+        self.mark_changed(name, defi)
         self.defs[name] = defi
 
     def merge_def(self, name, to_merge):
         if name not in self.defs:
+            self.mark_changed(name, to_merge)
             self.defs[name] = to_merge
             return
 
@@ -424,6 +424,9 @@ class ClassInheritanceGraph:
             return set()
         return self.must_exist_cls_edges[src_cls_edge]
 
+    def has_edge(self, child, parent):
+        return parent in self.graph.get(child, ())
+
     def add_edge(self, child, parent):
         self.graph[child].add(parent)
         if child in self.root_classes:
@@ -0,0 +1,42 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+
+class SnapshotManager(object):
+    """Persists the results of a run so that the next run over the same package can reuse them"""
+
+    def __init__(self, state_dir, key):
+        # snapshots produced by another interpreter version are never reused
+        self.state_dir = os.path.join(
+            os.path.abspath(state_dir), sys.implementation.cache_tag
+        )
+        self.path = os.path.join(
+            self.state_dir, hashlib.sha256(key.encode("utf-8", "surrogatepass")).hexdigest() + ".state"
+        )
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def get_path(self):
+        return self.path
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def store(self, state):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_dir)
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error writing state {self.path}: {e}")
+
+
+def get_digest(contents):
+    return hashlib.sha256(contents.encode("utf-8", "surrogatepass")).hexdigest()
@@ -0,0 +1,31 @@
+class SymbolManager(object):
+    """
+    Numbers every namespace the first time it is seen. The closure and taint
+    fixpoints run on these ids, and the names are only looked up again when
+    a processor reads a result.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def get_id(self, ns):
+        symbol = self.ids.get(ns)
+        if symbol is None:
+            symbol = self.ids[ns] = len(self.names)
+            self.names.append(ns)
+        return symbol
+
+    def find_id(self, ns):
+        # None for a namespace that was never numbered
+        return self.ids.get(ns)
+
+    def get_ns(self, symbol):
+        return self.names[symbol]
+
+    def get_names(self, symbols):
+        names = self.names
+        return frozenset([names[symbol] for symbol in symbols])
+
+    def __len__(self):
+        return len(self.names)
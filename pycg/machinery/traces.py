@@ -0,0 +1,88 @@
+import functools
+import json
+import os
+import threading
+import time
+
+
+class TraceManager(object):
+    """Records timed spans and writes them in the Chrome trace-event format"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.origin = time.time()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self.origin = time.time()
+
+    def is_enabled(self):
+        return self.enabled
+
+    def add_span(self, name, cat, start, end, **args):
+        # start and end are time.time() values, the format wants microseconds
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def span(self, name, cat, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, cat, args)
+
+    def traced(self, name, cat):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, name, cat, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+class Span(object):
+    def __init__(self, trace_manager, name, cat, args):
+        self.trace_manager = trace_manager
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.trace_manager.add_span(self.name, self.cat, self.start, time.time(), **self.args)
+        return False
+
+
+class NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+# shared by every component of a run, disabled unless --trace-out is given
+tracer = TraceManager()
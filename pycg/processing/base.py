@@ -21,13 +21,16 @@
 import ast
 import os
 import re
+import time
 
 from pycg import utils
 from pycg.machinery.definitions import Definition
+from pycg.machinery.pointers import LiteralPointer, get_literal
+from pycg.machinery.traces import tracer
 
 
 class ProcessingBase(ast.NodeVisitor):
-    def __init__(self, filename, modname, modules_analyzed):
+    def __init__(self, filename, modname, modules_analyzed, ast_manager=None):
         self.modname = modname
 
         self.modules_analyzed = modules_analyzed
@@ -35,8 +38,12 @@ class ProcessingBase(ast.NodeVisitor):
 
         self.filename = os.path.abspath(filename)
 
-        with open(filename, "rt", errors="replace") as f:
-            self.contents = f.read()
+        self.ast_manager = ast_manager
+        if self.ast_manager:
+            self.contents = self.ast_manager.get_contents(self.filename)
+        else:
+            with open(filename, "rt", errors="replace") as f:
+                self.contents = f.read()
 
         self.name_stack = []
         self.class_stack = []
@@ -46,8 +53,15 @@ class ProcessingBase(ast.NodeVisitor):
     def get_modules_analyzed(self):
         return self.modules_analyzed
 
+    def get_tree(self):
+        if self.ast_manager:
+            return self.ast_manager.get_tree(self.filename)
+        return ast.parse(self.contents, self.filename)
+
     def merge_modules_analyzed(self, analyzed):
-        self.modules_analyzed = self.modules_analyzed.union(analyzed)
+        # submodules usually share this registry, merging is then a no-op
+        if analyzed is not self.modules_analyzed:
+            self.modules_analyzed |= analyzed
 
     @property
     def current_ns(self):
@@ -171,7 +185,7 @@ class ProcessingBase(ast.NodeVisitor):
             elif isinstance(d, Definition) and d.get_type() == utils.constants.NAME_DEF and d.get_name() == 'UNKNOW':
                 d_ns = d.get_ns().replace('.' + d.get_name(), '')
                 d = self.def_manager.get(d_ns)
-                for pointer in set(d.get_name_pointer().get()):
+                for pointer in set(self.def_manager.get_targets(d)):
                     pointer_defi = self.def_manager.get(pointer)
                     if pointer_defi and pointer_defi.get_type() == utils.constants.FUN_DEF:
                         return_ns = utils.join_ns(
@@ -298,7 +312,7 @@ class ProcessingBase(ast.NodeVisitor):
                 if hasattr(self, "closured") and not defi:
                     defi = self.closured.get(self.current_ns + "." + caller)
                 if defi:
-                    if isinstance(defi, set):
+                    if isinstance(defi, (set, frozenset)):
                         decoded = []
                         for single_defi in defi:
                             decoded.append(self.def_manager.get(single_defi))
@@ -431,7 +445,7 @@ class ProcessingBase(ast.NodeVisitor):
             scope_def = self.scope_manager.get_def(self.current_ns, list_name)
             return [scope_def]
         elif isinstance(node, ast.Subscript):
-            names = self.retrieve_subscript_names(node)
+            names = self.retrieve_subscript_reads(node)
             defis = []
             for name in names:
                 defi = self.def_manager.get(name)
@@ -651,7 +665,7 @@ class ProcessingBase(ast.NodeVisitor):
                         continue
                     keys |= defi.get_lit_pointer().get()
             elif isinstance(s, str):
-                keys.add(s)
+                keys.add(get_literal(s))
             elif isinstance(s, int):
                 keys.add(utils.get_int_name(s))
 
@@ -673,12 +687,32 @@ class ProcessingBase(ast.NodeVisitor):
                     full_names.add(d)
         return full_names
 
+    def retrieve_subscript_reads(self, node):
+        # a literal set collapsed to its kinds no longer knows the exact
+        # keys, so reads match those keys against every key of the dict
+        names = self.retrieve_subscript_names(node)
+        for name in list(names):
+            d, _, key = name.rpartition('.')
+            if re.search(r'<dict\d+>$', d) is None:
+                continue
+            if key in LiteralPointer.WILDCARDS:
+                dict_scope = self.scope_manager.get_scope(d)
+                if dict_scope:
+                    names |= {defi.get_ns() for defi in dict_scope.get_defs().values()}
+                names.add(utils.join_ns(d, '<all>'))
+            else:
+                for wildcard in LiteralPointer.WILDCARDS:
+                    if self.def_manager.get(utils.join_ns(d, wildcard)):
+                        names.add(utils.join_ns(d, wildcard))
+        return names
+
     def retrieve_call_names(self, node):
         names = set()
         if isinstance(node.func, ast.Name):
             defi = self.scope_manager.get_def(self.current_ns, node.func.id)
             if defi:
-                names = self.closured.get(defi.get_ns(), [])
+                # closure entries are shared, callers get their own copy
+                names = set(self.closured.get(defi.get_ns(), ()))
                 for parent_name in names:
                     if (defi.get_ns().endswith(".self") or defi.get_type() == utils.constants.INS_DEF):
                         cls_names = self.find_cls_fun_ns(parent_name, utils.constants.CALL_Method)
@@ -702,28 +736,24 @@ class ProcessingBase(ast.NodeVisitor):
                         names.add(point_value)
         elif isinstance(node.func, ast.Subscript):
             # Calls can be performed only on single indices, not ranges
-            full_names = self.retrieve_subscript_names(node.func)
+            full_names = self.retrieve_subscript_reads(node.func)
             for n in full_names:
                 if self.closured.get(n, None):
                     names |= self.closured.get(n)
                 defi = self.def_manager.get(n)
                 if defi and defi.get_type() == utils.constants.INS_DEF:
-                    for parent_name in defi.get_name_pointer().get():
+                    for parent_name in self.def_manager.get_targets(defi):
                         cls_names = self.find_cls_fun_ns(parent_name, utils.constants.CALL_Method)
                         names = names.union(cls_names)
 
         return names
 
-    def analyze_submodules(self, cls, *args, **kwargs):
-        imports = self.import_manager.get_imports(self.modname)
-
-        for imp in imports:
-            self.analyze_submodule(cls, imp, *args, **kwargs)
-
-    def analyze_submodule(self, cls, imp, *args, **kwargs):
+    def get_submodule_file(self, imp):
         if imp in self.get_modules_analyzed():
             return
+        return self.get_module_file(imp)
 
+    def get_module_file(self, imp):
         fname = self.import_manager.get_filepath(imp)
 
         if (
@@ -732,10 +762,67 @@ class ProcessingBase(ast.NodeVisitor):
                 or self.import_manager.get_mod_dir() not in fname
         ):
             return
+        return fname
+
+    def get_submodules(self):
+        # (cls, module name, args, kwargs) of each module to visit once this one is done
+        return ()
+
+    def analyze_module(self):
+        self.visit(self.get_tree())
+
+    def analyze_submodules(self):
+        # Same depth first order as calling analyze_submodule after the visit,
+        # but driven from an explicit stack so that long import chains don't
+        # nest one interpreter frame per module. A processor is released as
+        # soon as its visit is done, the stack only keeps what its submodules
+        # need from it.
+        stack = [self.get_submodule_frame(self, None)]
+        while stack:
+            name, modname, filename, analyzed, submodules, start = stack[-1]
+            submodule = next(submodules, None)
+            if submodule is None:
+                stack.pop()
+                if stack:
+                    parent_modname, parent_filename, parent_analyzed = stack[-1][1:4]
+                    tracer.add_span(name, "submodule", start, time.time(), module=modname, parent=parent_modname)
+                    if analyzed is not parent_analyzed:
+                        parent_analyzed |= analyzed
+                    self.import_manager.set_current_mod(parent_modname, parent_filename)
+                continue
+
+            cls, imp, args, kwargs = submodule
+            if imp in analyzed:
+                continue
+            fname = self.get_module_file(imp)
+            if not fname:
+                continue
+
+            self.import_manager.set_current_mod(imp, fname)
+            start = time.time()
+            visitor = cls(fname, imp, *args, **kwargs)
+            visitor.analyze_module()
+            stack.append(self.get_submodule_frame(visitor, start))
+            visitor = None
+
+    def get_submodule_frame(self, processor, start):
+        # the submodules are listed once the visit is done, like the
+        # recursive version did, and hold the shared managers only
+        return (type(processor).__name__, processor.modname, processor.filename,
+                processor.get_modules_analyzed(), iter(list(processor.get_submodules())), start)
+
+    def analyze_submodule(self, cls, imp, *args, **kwargs):
+        # the import, pre and location processors descend at the import
+        # statement and read what the submodule produced in the rest of their
+        # visit, so they keep recursing through here
+        fname = self.get_submodule_file(imp)
+        if not fname:
+            return
 
         self.import_manager.set_current_mod(imp, fname)
-        visitor = cls(fname, imp, *args, **kwargs)
-        visitor.analyze()
+        with tracer.span(cls.__name__, "submodule", module=imp, parent=self.modname):
+            visitor = cls(fname, imp, *args, **kwargs)
+            visitor.analyze()
         self.merge_modules_analyzed(visitor.get_modules_analyzed())
 
         self.import_manager.set_current_mod(self.modname, self.filename)
@@ -769,6 +856,8 @@ class ProcessingBase(ast.NodeVisitor):
     def add_ext_mod_node(self, name):
         ext_modname = name.split(".")[0]
         ext_mod = self.module_manager.get(ext_modname)
+        if (not ext_mod or name not in ext_mod.get_methods()) and hasattr(self, "mark_external_changed"):
+            self.mark_external_changed()
         if not ext_mod:
             ext_mod = self.module_manager.create(ext_modname, None, external=True)
             ext_mod.add_method(ext_modname)
@@ -22,6 +22,7 @@ import ast
 import os
 
 from pycg import utils
+from pycg.machinery.closures import ClosureManager
 from pycg.machinery.definitions import Definition
 from pycg.machinery.contexts import ContextManager
 from pycg.processing.base import ProcessingBase
@@ -43,8 +44,10 @@ class CallGraphProcessor(ProcessingBase):
             context_manager,
             call_graph=None,
             modules_analyzed=None,
+            ast_manager=None,
+            closure_manager=None,
     ):
-        super().__init__(filename, modname, modules_analyzed)
+        super().__init__(filename, modname, modules_analyzed, ast_manager)
         # parent directory of file
         self.parent_dir = os.path.dirname(filename)
 
@@ -62,8 +65,9 @@ class CallGraphProcessor(ProcessingBase):
         self.call_graph.set_middles(self.middle_manager.get_nodes())
         self.context_manager = context_manager
 
-        self.closured = self.def_manager.transitive_closure()
-        self.taints = self.def_manager.transitive_taints()
+        self.closure_manager = closure_manager or ClosureManager(def_manager)
+        self.closured = self.closure_manager.get_closure()
+        self.taints = self.closure_manager.get_taints()
         self.hierarchy_graph = self.sink_manager.get_hierarchy_graph()
         self.resource_field = None
 
@@ -431,12 +435,9 @@ class CallGraphProcessor(ProcessingBase):
         self.visit(node.value)
         self.is_taint(node.value, node)
 
-    def analyze_submodules(self):
-        imports = self.sink_manager.get_extra_mods()
-        for imp in imports:
-            self.analyze_submodule(
-                CallGraphProcessor,
-                imp,
+    def get_submodules(self):
+        for imp in self.sink_manager.get_extra_mods():
+            yield CallGraphProcessor, imp, (
                 self.import_manager,
                 self.scope_manager,
                 self.def_manager,
@@ -446,15 +447,15 @@ class CallGraphProcessor(ProcessingBase):
                 self.intersection_manager,
                 self.middle_manager,
                 self.context_manager,
+            ), dict(
                 call_graph=self.call_graph,
                 modules_analyzed=self.get_modules_analyzed(),
+                ast_manager=self.ast_manager,
+                closure_manager=self.closure_manager,
             )
 
-    def analyze_submodule(self, cls, imp, *args, **kwargs):
-        super().analyze_submodule(cls, imp, *args, **kwargs)
-
     def analyze(self):
-        self.visit(ast.parse(self.contents, self.filename))
+        self.analyze_module()
         self.analyze_submodules()
 
     def get_all_reachable_functions(self):
@@ -523,8 +524,7 @@ class CallGraphProcessor(ProcessingBase):
 
     def add_taint(self, defi, node):
         if isinstance(defi, Definition):
-            caller_taint = self.taints.get(defi.get_ns())
-            if caller_taint and any(element.startswith("Taint-Sink") for element in caller_taint):
+            if defi.get_ns() in self.taints:
                 taint_line = "line: " + str(node.lineno)
                 try:
                     stmt = ast.unparse(node)
@@ -23,8 +23,9 @@ class ImportProcessor(ProcessingBase):
             import_chain,
             complete,
             modules_analyzed=None,
+            ast_manager=None,
     ):
-        super().__init__(filename, modname, modules_analyzed)
+        super().__init__(filename, modname, modules_analyzed, ast_manager)
 
         self.modname = modname
         self.mod_dir = "/".join(self.filename.split("/")[:-1])
@@ -65,6 +66,7 @@ class ImportProcessor(ProcessingBase):
             self.import_chain,
             self.complete,
             modules_analyzed=self.get_modules_analyzed(),
+            ast_manager=self.ast_manager,
         )
 
     def visit_Module(self, node):
@@ -154,8 +156,7 @@ class ImportProcessor(ProcessingBase):
                 if imported_name not in self.modules_analyzed:
                     self.analyze_submodule(imported_name)
 
-            import_node['import_tree'].add(imported_name)
-            import_node['import_tree'].update(self.import_manager.get_node(imported_name)['import_tree'])
+            self.import_manager.create_tree_edge(imported_name)
 
             if import_item.asname:
                 tgt_name = import_item.name
@@ -574,7 +575,7 @@ class ImportProcessor(ProcessingBase):
                      or (isinstance(node.func, ast.Name) and method_name + '-l' in potent_module_nodes)
                      or (method_name == 'cls' and current_class_name in potent_method_nodes)
                      or (class_name and class_name + '.' + method_name in potent_module_nodes))
-                    and (not sink_module_mod or self.have_target_mod(sink_module_mod, import_node['import_tree']))
+                    and (not sink_module_mod or self.have_target_mod(sink_module_mod))
             ):
                 if isinstance(node.func, ast.Name) and method_name + '-l' in potent_module_nodes:
                     suffix_method = method_name + '-l'
@@ -660,11 +661,11 @@ class ImportProcessor(ProcessingBase):
                 current_ns = self.modname
             self.import_manager.create_sink_edge(current_ns, import_part_name)
 
-    def have_target_mod(self, targets, import_tree):
+    def have_target_mod(self, targets):
         if not targets:
             return
         for target in targets:
-            if target in import_tree:
+            if self.import_manager.in_import_tree(self.modname, target):
                 return True
         return False
 
@@ -1145,4 +1146,4 @@ class ImportProcessor(ProcessingBase):
             self.import_manager.create_node(self.modname)
             self.import_manager.set_filepath(self.modname, self.filename)
 
-        self.visit(ast.parse(self.contents, self.filename))
+        self.visit(self.get_tree())
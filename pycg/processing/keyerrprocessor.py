@@ -23,6 +23,7 @@ import os
 import re
 
 from pycg import utils
+from pycg.machinery.closures import ClosureManager
 from pycg.processing.base import ProcessingBase
 
 
@@ -37,8 +38,10 @@ class KeyErrProcessor(ProcessingBase):
         class_manager,
         key_errs,
         modules_analyzed=None,
+        ast_manager=None,
+        closure_manager=None,
     ):
-        super().__init__(filename, modname, modules_analyzed)
+        super().__init__(filename, modname, modules_analyzed, ast_manager)
         # parent directory of file
         self.parent_dir = os.path.dirname(filename)
 
@@ -48,7 +51,8 @@ class KeyErrProcessor(ProcessingBase):
         self.class_manager = class_manager
         self.key_errs = key_errs
 
-        self.closured = self.def_manager.transitive_closure()
+        self.closure_manager = closure_manager or ClosureManager(def_manager)
+        self.closured = self.closure_manager.get_closure()
         self.state = "keyerr"
 
     def visit_Subscript(self, node):
@@ -78,19 +82,22 @@ class KeyErrProcessor(ProcessingBase):
 
         return False
 
-    def analyze_submodules(self):
-        super().analyze_submodules(
-            KeyErrProcessor,
-            self.import_manager,
-            self.scope_manager,
-            self.def_manager,
-            self.class_manager,
-            self.key_errs,
-            modules_analyzed=self.get_modules_analyzed(),
-        )
+    def get_submodules(self):
+        for imp in self.import_manager.get_imports(self.modname):
+            yield KeyErrProcessor, imp, (
+                self.import_manager,
+                self.scope_manager,
+                self.def_manager,
+                self.class_manager,
+                self.key_errs,
+            ), dict(
+                modules_analyzed=self.get_modules_analyzed(),
+                ast_manager=self.ast_manager,
+                closure_manager=self.closure_manager,
+            )
 
     def analyze(self):
-        self.visit(ast.parse(self.contents, self.filename))
+        self.analyze_module()
         self.analyze_submodules()
 
     def visit_Lambda(self, node):
@@ -20,8 +20,9 @@ class LocationProcessor(ProcessingBase):
             sink_manager,
             location_messages,
             modules_analyzed=None,
+            ast_manager=None,
     ):
-        super().__init__(filename, modname, modules_analyzed)
+        super().__init__(filename, modname, modules_analyzed, ast_manager)
 
         self.modname = modname
         self.mod_dir = "/".join(self.filename.split("/")[:-1])
@@ -54,6 +55,7 @@ class LocationProcessor(ProcessingBase):
             self.sink_manager,
             self.location_messages,
             modules_analyzed=self.get_modules_analyzed(),
+            ast_manager=self.ast_manager,
         )
 
     def visit_Module(self, node):
@@ -550,4 +552,4 @@ class LocationProcessor(ProcessingBase):
         if not self.import_manager.get_node(self.modname):
             self.import_manager.create_node(self.modname)
             self.import_manager.set_filepath(self.modname, self.filename)
-        self.visit(ast.parse(self.contents, self.filename))
+        self.visit(self.get_tree())
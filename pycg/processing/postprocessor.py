@@ -21,9 +21,12 @@
 import ast
 import re
 
-from copy import deepcopy
 from pycg import utils
+from pycg.machinery.closures import ClosureManager
 from pycg.machinery.definitions import Definition
+from pycg.machinery.dependencies import CLOSURE, TAINT, WatchedMap
+from pycg.machinery.pointers import get_literal
+from pycg.machinery.traces import tracer
 from pycg.processing.base import ProcessingBase
 from pycg.processing.preprocessor import PreProcessor
 
@@ -43,8 +46,11 @@ class PostProcessor(ProcessingBase):
             intersection_manager,
             sink_manager,
             modules_analyzed=None,
+            ast_manager=None,
+            closure_manager=None,
+            dependency_manager=None,
     ):
-        super().__init__(input_file, modname, modules_analyzed)
+        super().__init__(input_file, modname, modules_analyzed, ast_manager)
         self.import_manager = import_manager
         self.scope_manager = scope_manager
         self.def_manager = def_manager
@@ -54,14 +60,60 @@ class PostProcessor(ProcessingBase):
         self.middle_manager = middle_manager
         self.intersection_manager = intersection_manager
         self.sink_manager = sink_manager
-        self.closured = self.def_manager.transitive_closure()
-        self.taints = self.def_manager.transitive_taints()
+        # processors built without a generator keep a closure of their own
+        self.closure_manager = closure_manager or ClosureManager(def_manager)
+        self.dependency_manager = dependency_manager
+        self.closured = self.get_closure()
+        self.taints = self.get_taints()
         self.middle_skip = dict()
         self.hierarchy_graph = self.sink_manager.get_hierarchy_graph()
         self.extra_mods = set()
         self.exec_preProcessor_flag = False
         self.is_call_middle = False
 
+    def get_closure(self):
+        closured = self.closure_manager.get_closure()
+        if self.dependency_manager:
+            return WatchedMap(closured, CLOSURE, self.dependency_manager)
+        return closured
+
+    def get_taints(self):
+        taints = self.closure_manager.get_taints()
+        if self.dependency_manager:
+            return WatchedMap(taints, TAINT, self.dependency_manager)
+        return taints
+
+    def get_visit_state(self):
+        # what a unit may pick up from the statements before it and leave to the ones after it
+        names = None if self.last_called_names is None else frozenset(self.last_called_names)
+        return self.is_call_middle, names, self.exec_preProcessor_flag
+
+    def set_visit_state(self, state):
+        is_call_middle, names, exec_preProcessor_flag = state
+        self.is_call_middle = is_call_middle
+        self.last_called_names = None if names is None else set(names)
+        if self.exec_preProcessor_flag and not exec_preProcessor_flag:
+            self.closured = self.get_closure()
+        self.exec_preProcessor_flag = exec_preProcessor_flag
+
+    def visit_unit(self, unit, visit, *args):
+        # a unit none of whose inputs changed since its last visit would
+        # only repeat what it already did, so it is skipped
+        if not self.dependency_manager:
+            visit(*args)
+            return
+        entry = self.get_visit_state()
+        if self.dependency_manager.is_clean(unit, entry):
+            self.set_visit_state(self.dependency_manager.skip(unit))
+            return
+        self.dependency_manager.begin(entry)
+        visit(*args)
+        self.dependency_manager.end(unit, self.get_visit_state())
+
+    def mark_external_changed(self):
+        if self.dependency_manager:
+            self.dependency_manager.mark_external_changed()
+
     def visit_Lambda(self, node):
         counter = self.scope_manager.get_scope(self.current_ns).inc_lambda_counter()
         lambda_name = utils.get_lambda_name(counter)
@@ -72,7 +124,7 @@ class PostProcessor(ProcessingBase):
         self.visit(node.func)
         fun_name = self.determine_method_to_analyze(node)
         if self.exec_preProcessor_flag:
-            self.closured = self.def_manager.transitive_closure()
+            self.closured = self.get_closure()
             self.exec_preProcessor_flag = False
         if fun_name == 'skip':
             return
@@ -186,7 +238,10 @@ class PostProcessor(ProcessingBase):
                     continue
 
             if "copy_context.run" in names and del_flag and len(node.args) > 0:
-                del node.args[0]
+                # the tree is shared between passes, so drop the argument on a copy
+                node = ast.copy_location(
+                    ast.Call(func=node.func, args=node.args[1:], keywords=node.keywords), node
+                )
                 del_flag = False
 
             self.iterate_call_args(defi, node)
@@ -250,7 +305,7 @@ class PostProcessor(ProcessingBase):
                     if isinstance(param_def, Definition):
                         lit_values = param_def.get_lit_pointer().get()
                         if not lit_values or (lit_value == 'UNKNOWN' for lit_value in lit_values):
-                            param_def.get_taint_pointer().add('Taint-Sink-' + self.current_ns)
+                            param_def.mark_sink()
                         else:
                             continue
 
@@ -265,7 +320,7 @@ class PostProcessor(ProcessingBase):
                     if isinstance(param_def, Definition):
                         lit_values = param_def.get_lit_pointer().get()
                         if not lit_values or any(not isinstance(lit_value, (str, int)) for lit_value in lit_values):
-                            param_def.get_taint_pointer().add('Taint-Sink-' + self.current_ns)
+                            param_def.mark_sink()
                         else:
                             continue
 
@@ -326,7 +381,7 @@ class PostProcessor(ProcessingBase):
             if not fun_name and hasattr(node.func, 'func') and hasattr(node.func.func, 'id'):
                 fun_name = node.func.func.id
                 if fun_name not in self.sink_manager.get_potent_method_nodes():
-                    orig_args = deepcopy(node.func.args)
+                    orig_args = list(node.func.args)
                     node.func.args.extend(node.args)
                     self.determine_method_to_analyze(node.func)
                     node.func.args = orig_args
@@ -419,8 +474,7 @@ class PostProcessor(ProcessingBase):
         for caller_point_value in caller_point_values:
             if not caller_point_value.endswith(fun_name):
                 caller_point_value = caller_point_value + "." + fun_name
-            caller_taint = self.taints.get(caller_point_value)
-            if caller_taint and any(element.startswith("Taint-Sink") for element in caller_taint):
+            if caller_point_value in self.taints:
                 input_mod = self.def_manager.get(caller_point_value).get_module_name()
                 caller_part_name = caller_point_value.replace(input_mod + '.', '')
                 if (
@@ -526,6 +580,7 @@ class PostProcessor(ProcessingBase):
         if current_ns in sink_node["sink_method_user"]:
             return
         sink_node["sink_method_user"][current_ns] = {'callee': set(), 'caller': set()}
+        self.mark_external_changed()
         self.sink_manager.add_potent_method_node(current_ns, {input_mod})
         self.extract_and_store_potential_sink_methods(current_ns, input_mod, sink_node)
         for sup_cls, sup_mod in get_module.get_class(caller_part_name)['sup_classes'].items():
@@ -533,22 +588,28 @@ class PostProcessor(ProcessingBase):
             self.init_potent_sink_method(sup_mod, sup_cls_name, fun_name, count + 1)
         self.get_modules_analyzed().discard(input_mod)
         self.exec_preProcessor(input_file, input_mod, self.get_modules_analyzed())
-        self.extra_mods.add(input_mod)
+        self.add_extra_mod(input_mod)
 
     def exec_preProcessor(self, input_file, input_mod, modules_analyzed):
-        processor = PreProcessor(
-            input_file,
-            input_mod,
-            self.import_manager,
-            self.scope_manager,
-            self.def_manager,
-            self.class_manager,
-            self.module_manager,
-            self.sink_manager,
-            modules_analyzed=modules_analyzed,
-        )
-        processor.analyze()
+        with tracer.span("PreProcessor", "reprocess", module=input_mod):
+            processor = PreProcessor(
+                input_file,
+                input_mod,
+                self.import_manager,
+                self.scope_manager,
+                self.def_manager,
+                self.class_manager,
+                self.module_manager,
+                self.sink_manager,
+                modules_analyzed=modules_analyzed,
+                ast_manager=self.ast_manager,
+            )
+            processor.analyze()
         self.exec_preProcessor_flag = True
+        if self.dependency_manager:
+            # a skipped visit would not rerun the pre processor
+            self.dependency_manager.mark_volatile()
+            self.dependency_manager.check_external()
 
     def is_sink_by_field_taint(self, input_mod, caller_part_name, field_name):
         if not input_mod or not caller_part_name:
@@ -726,6 +787,10 @@ class PostProcessor(ProcessingBase):
         ):
             return
 
+        unit = (utils.join_ns(self.current_ns, node.name), node.lineno, node.col_offset)
+        self.visit_unit(unit, self.analyze_function, node)
+
+    def analyze_function(self, node):
         # here we iterate decorators
         if node.decorator_list:
             fn_def = self.def_manager.get(utils.join_ns(self.current_ns, node.name))
@@ -807,11 +872,13 @@ class PostProcessor(ProcessingBase):
             for base_def in bases:
                 if not isinstance(base_def, Definition):
                     continue
-                for final_class in self.closured.get(base_def.get_ns()):
+                for final_class in self.closured.get(base_def.get_ns(), ()):
+                    if not self.hierarchy_graph.has_edge(self.modname + '.' + class_name, final_class):
+                        self.mark_external_changed()
                     self.hierarchy_graph.add_edge(self.modname + '.' + class_name, final_class)
                 names = set()
                 if base_def.get_name_pointer().get():
-                    names = base_def.get_name_pointer().get()
+                    names = self.def_manager.get_targets(base_def)
                 else:
                     names.add(base_def.get_ns())
                 for name in names:
@@ -822,7 +889,7 @@ class PostProcessor(ProcessingBase):
                     parent_cls = self.class_manager.get(name)
                     if parent_cls:
                         cls.add_parent(parent_cls.get_mro())
-                        self.extra_mods.add(parent_cls.get_module())
+                        self.add_extra_mod(parent_cls.get_module())
                         if parent_cls_defi := self.def_manager.get(name):
                             sup_class_fields.update(parent_cls_defi.get_name_pointer().get_args())
 
@@ -965,7 +1032,7 @@ class PostProcessor(ProcessingBase):
                     names = set()
                     if isinstance(k, list):
                         continue
-                    names.add(k)
+                    names.add(get_literal(k))
                 for name in names:
                     # create a definition for the key
                     if isinstance(name, int):
@@ -1041,6 +1108,8 @@ class PostProcessor(ProcessingBase):
 
                         if field_type:
                             ann_def.get_name_pointer().add(field_type)
+                            if sink_node["sink_field"].get(ann_def.get_ns()) != field_type:
+                                self.mark_external_changed()
                             sink_node["sink_field"][ann_def.get_ns()] = field_type
 
     def visit_comprehension(self, node):
@@ -1083,7 +1152,7 @@ class PostProcessor(ProcessingBase):
                 if hasattr(self, "closured") and not defi:
                     defi = self.closured.get(self.current_ns + "." + caller)
                 if defi:
-                    if isinstance(defi, set):
+                    if isinstance(defi, (set, frozenset)):
                         decoded = []
                         for single_defi in defi:
                             decoded.append(self.def_manager.get(single_defi))
@@ -1135,11 +1204,15 @@ class PostProcessor(ProcessingBase):
                 new_def.get_name_pointer().add_set(names)
                 new_def.get_name_pointer().add(child_def.get_ns())
 
-    def analyze_submodules(self):
+    def add_extra_mod(self, modname):
+        # the extra modules are only visited when a unit asks for them
+        if self.dependency_manager:
+            self.dependency_manager.mark_volatile()
+        self.extra_mods.add(modname)
+
+    def get_submodules(self):
         for imp in self.extra_mods:
-            self.analyze_submodule(
-                PostProcessor,
-                imp,
+            yield PostProcessor, imp, (
                 self.import_manager,
                 self.scope_manager,
                 self.def_manager,
@@ -1149,16 +1222,23 @@ class PostProcessor(ProcessingBase):
                 self.middle_manager,
                 self.intersection_manager,
                 self.sink_manager,
+            ), dict(
                 modules_analyzed=self.get_modules_analyzed(),
+                ast_manager=self.ast_manager,
+                closure_manager=self.closure_manager,
+                dependency_manager=self.dependency_manager,
             )
         self.extra_mods.clear()
 
-    def analyze_submodule(self, cls, imp, *args, **kwargs):
-        super().analyze_submodule(cls, imp, *args, **kwargs)
-
-    def analyze(self):
+    def analyze_module(self):
         self.extra_mods.clear()
-        self.visit(ast.parse(self.contents, self.filename))
+        self.visit_unit((self.modname,), self.analyze_module_tree)
+
+    def analyze_module_tree(self):
+        self.visit(self.get_tree())
         module_fields = self.module_manager.get(self.modname).get_fields()
         self.find_potent_sink_method_by_field(module_fields)
+
+    def analyze(self):
+        self.analyze_module()
         self.analyze_submodules()
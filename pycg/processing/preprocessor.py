@@ -37,8 +37,9 @@ class PreProcessor(ProcessingBase):
             module_manager,
             sink_manager,
             modules_analyzed=None,
+            ast_manager=None,
     ):
-        super().__init__(filename, modname, modules_analyzed)
+        super().__init__(filename, modname, modules_analyzed, ast_manager)
 
         self.modname = modname
         self.mod_dir = "/".join(self.filename.split("/")[:-1])
@@ -96,6 +97,7 @@ class PreProcessor(ProcessingBase):
             self.module_manager,
             self.sink_manager,
             modules_analyzed=self.get_modules_analyzed(),
+            ast_manager=self.ast_manager,
         )
 
         if modname in self.sink_manager.get_nodes():
@@ -285,6 +287,10 @@ class PreProcessor(ProcessingBase):
         defs_to_create = []
         name_pointer = fn_def.get_name_pointer()
 
+        # the tree is shared with the other passes, so the bound first
+        # argument is skipped here instead of being removed from the node
+        args = node.args.args
+
         # TODO: static methods can be created using
         # the staticmethod() function too
         is_static_method = False
@@ -299,9 +305,9 @@ class PreProcessor(ProcessingBase):
         if (
                 current_def.get_type() == utils.constants.CLS_DEF
                 and not is_static_method
-                and node.args.args
+                and args
         ):
-            arg_ns = utils.join_ns(fn_def.get_ns(), node.args.args[0].arg)
+            arg_ns = utils.join_ns(fn_def.get_ns(), args[0].arg)
             arg_def = self.def_manager.get(arg_ns)
             if not arg_def:
                 # Add processing logic such that if a method’s first parameter is cls, it will be treated as a class.
@@ -315,7 +321,7 @@ class PreProcessor(ProcessingBase):
                 self.scope_manager.handle_assign(
                     fn_def.get_ns(), arg_def.get_name(), arg_def
                 )
-                node.args.args = node.args.args[1:]
+                args = args[1:]
 
         sink_node = None
         if self.modname in self.sink_manager.get_nodes():
@@ -323,7 +329,7 @@ class PreProcessor(ProcessingBase):
 
         sink_variable = dict()
 
-        for pos, arg in enumerate(node.args.args):
+        for pos, arg in enumerate(args):
             arg_ns = utils.join_ns(fn_def.get_ns(), arg.arg)
             name_pointer.add_pos_arg(pos, arg.arg, arg_ns)
             defs_to_create.append(arg_ns)
@@ -615,4 +621,4 @@ class PreProcessor(ProcessingBase):
         super().visit_ClassDef(node)
 
     def analyze(self):
-        self.visit(ast.parse(self.contents, self.filename))
+        self.visit(self.get_tree())
@@ -18,22 +18,32 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import ast
 import os
 import time
 
 from pycg import utils
+from pycg.machinery.asts import AstManager
+from pycg.machinery.caches import ParseCache
 from pycg.machinery.callgraph import CallGraph
 from pycg.machinery.classes import ClassManager
+from pycg.machinery.closures import ClosureManager
 from pycg.machinery.contexts import ContextManager
 from pycg.machinery.definitions import DefinitionManager
+from pycg.machinery.dependencies import DependencyManager
 from pycg.machinery.imports import ImportManager
 from pycg.machinery.intersections import IntersectionManager
 from pycg.machinery.key_err import KeyErrors
+from pycg.machinery.memory import memory_profiler
 from pycg.machinery.middles import MiddleManager
 from pycg.machinery.modules import ModuleManager
+from pycg.machinery.patterns import PatternMatcher
+from pycg.machinery.reachability import iter_components
 from pycg.machinery.scopes import ScopeManager
 from pycg.machinery.sinks import SinkManager
+from pycg.machinery.snapshots import SnapshotManager, get_digest
 from pycg.machinery.sources import SourceManager
+from pycg.machinery.traces import tracer
 from pycg.processing.cgprocessor import CallGraphProcessor
 from pycg.processing.importprocessor import ImportProcessor
 from pycg.processing.keyerrprocessor import KeyErrProcessor
@@ -42,8 +52,17 @@ from pycg.processing.preprocessor import PreProcessor
 from pycg.processing.locationprocessor import LocationProcessor
 
 
+# the managers holding the results a later run can reuse
+STATE_ATTRS = (
+    "cg", "def_manager", "scope_manager", "class_manager", "module_manager", "sink_manager", "middle_manager",
+    "intersection_manager", "source_manager", "key_errs", "location_messages", "import_chain", "analyzed_modules",
+)
+
+
 class CallGraphGenerator(object):
-    def __init__(self, entry_points, sink_points, package, max_iter, operation, complete):
+    def __init__(self, entry_points, sink_points, package, max_iter, operation, complete,
+                 cache_dir=None, cache_size=None, ast_manager=None, prefilter=utils.constants.SUBSTRING_FILTER,
+                 state_dir=None, changed_files=None, max_points_to=None):
         self.entry_points = entry_points
         self.sink_points = sink_points
         self.package = package
@@ -51,18 +70,38 @@ class CallGraphGenerator(object):
         self.max_iter = max_iter
         self.operation = operation
         self.complete = complete
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.ast_manager = ast_manager
+        self.prefilter = prefilter
+        self.state_dir = state_dir
+        self.changed_files = changed_files
+        self.max_points_to = max_points_to
+        self.analyzed_modules = set()
         self.import_chain = []
         self.location_messages = {"sup_class": dict(), "import_message": dict()}
         self.setUp()
 
     def setUp(self):
+        # the ast manager may be shared with the runs of other sink families
+        if not self.ast_manager:
+            parse_cache = None
+            if self.cache_dir:
+                parse_cache = ParseCache(self.cache_dir, self.cache_size)
+            self.ast_manager = AstManager(parse_cache)
+        self.parse_cache = self.ast_manager.get_parse_cache()
+        self.snapshot_manager = None
+        if self.state_dir:
+            self.snapshot_manager = SnapshotManager(self.state_dir, self._get_state_key())
         self.source_manager = SourceManager()
         self.middle_manager = MiddleManager()
         self.intersection_manager = IntersectionManager()
         self.sink_manager = SinkManager()
         self.import_manager = ImportManager()
-        self.scope_manager = ScopeManager()
+        self.scope_manager = ScopeManager(self.parse_cache)
         self.def_manager = DefinitionManager()
+        self.def_manager.set_max_points_to(self.max_points_to)
+        self.closure_manager = ClosureManager(self.def_manager)
         self.class_manager = ClassManager()
         self.module_manager = ModuleManager()
         self.context_manager = ContextManager()
@@ -71,24 +110,44 @@ class CallGraphGenerator(object):
         self.middle_manager.set_class_messages(self.module_manager.get_internal_modules())
 
     def extract_state(self):
-        state = {}
-        state["defs"] = {}
-        for key, defi in self.def_manager.get_defs().items():
-            state["defs"][key] = {
-                "names": defi.get_name_pointer().get().copy(),
-                "lit": defi.get_lit_pointer().get().copy(),
-            }
-
-        state["scopes"] = {}
-        for key, scope in self.scope_manager.get_scopes().items():
-            state["scopes"][key] = set([
-                x.get_ns() for (_, x) in scope.get_defs().items()
-            ])
+        # every manager counts the changes of the state the fixpoint converges
+        # on, so comparing the counters replaces comparing full snapshots
+        return (
+            self.def_manager.get_epoch(),
+            self.scope_manager.get_epoch(),
+            self.class_manager.get_epoch(),
+        )
 
-        state["classes"] = {}
-        for key, ch in self.class_manager.get_classes().items():
-            state["classes"][key] = ch.get_mro().copy()
-        return state
+    def set_dependency_manager(self, dependency_manager):
+        # only the post processor iterations track what they read
+        self.def_manager.set_dependency_manager(dependency_manager)
+        self.scope_manager.set_dependency_manager(dependency_manager)
+        self.class_manager.set_dependency_manager(dependency_manager)
+        return dependency_manager
+
+    def get_external_signature(self):
+        # the state outside definitions, scopes and classes the post processor
+        # reads; it only grows, so the sizes change whenever it does
+        sizes = [len(self.sink_manager.get_nodes()), len(self.sink_manager.get_potent_method_nodes()),
+                 len(self.sink_manager.get_potent_module_nodes()), len(self.middle_manager.get_nodes()),
+                 len(self.middle_manager.get_potent_method_nodes()), len(self.import_manager.get_import_graph()),
+                 len(self.source_manager.get_source_files())]
+        for node in self.sink_manager.get_nodes().values():
+            sizes.extend((len(node["sink_method_user"]), len(node["sink_field"]), len(node["pre_analyzed"]),
+                          len(node["sink_module_user"]), len(node["caller_message"])))
+        for node in self.middle_manager.get_nodes().values():
+            sizes.append(len(node["potent_method"]))
+        for parents in self.sink_manager.get_hierarchy_graph().graph.values():
+            sizes.append(len(parents))
+        for modules in (self.module_manager.get_internal_modules(), self.module_manager.get_external_modules()):
+            sizes.append(len(modules))
+            for module in modules.values():
+                sizes.extend((len(module.get_methods()), len(module.get_classes()), len(module.get_fields())))
+                sizes.extend(len(methods) for methods in module.get_fields().values())
+                for cls in module.get_classes().values():
+                    sizes.extend((len(cls["sup_classes"]), len(cls["fields"]), len(cls["methods"])))
+                    sizes.extend(len(methods) for methods in cls["fields"].values())
+        return tuple(sizes)
 
     def reset_counters(self):
         for key, scope in self.scope_manager.get_scopes().items():
@@ -98,38 +157,7 @@ class CallGraphGenerator(object):
         if not self.state:
             return False
 
-        curr_state = self.extract_state()
-
-        # check defs
-        for key, defi in curr_state["defs"].items():
-            if key not in self.state["defs"]:
-                return False
-            if defi["names"] != self.state["defs"][key]["names"]:
-                return False
-            if defi["lit"] != self.state["defs"][key]["lit"]:
-                return False
-
-        # check scopes
-        for key, scope in curr_state["scopes"].items():
-            if key not in self.state["scopes"]:
-                return False
-            if scope != self.state["scopes"][key]:
-                return False
-
-        # check classes
-        for key, ch in curr_state["classes"].items():
-            if key not in self.state["classes"]:
-                return False
-            if ch != self.state["classes"][key]:
-                return False
-
-        return True
-
-    def remove_import_hooks(self):
-        self.import_manager.remove_hooks()
-
-    def tearDown(self):
-        self.remove_import_hooks()
+        return self.extract_state() == self.state
 
     def _get_mod_name(self, entry, pkg):
         # We do this because we want __init__ modules to
@@ -144,8 +172,9 @@ class CallGraphGenerator(object):
         return input_mod
 
     def find_entry_and_sink(self):
-        search_list = self.sink_manager.get_sink_points()
-        search_middle_list = self.middle_manager.get_middle_methods()
+        matcher = PatternMatcher(
+            self.sink_manager.get_sink_points(), self.middle_manager.get_middle_methods()
+        )
         matching_files = []
         middle_files = []
         entry_files = []
@@ -159,28 +188,22 @@ class CallGraphGenerator(object):
                 file_path = os.path.join(root, file)
                 try:
                     skip = False
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        for search_string in search_list:
-                            if file_path in matching_files:
-                                continue
-                            sink_module, sink_name, param_index = search_string.split(':')
-                            if sink_name + '(' in content:
-                                matching_files.append(file_path)
-                                skip = True
-                            if sink_module in content:
-                                matching_files.append(file_path)
-                                skip = True
-                        for middle_search_string in search_middle_list:
-                            if file_path in middle_files:
-                                continue
-                            middle_module, middle_name, param_index = middle_search_string.split(':')
-                            if any(prefix + middle_module in content for prefix in ("import ", "from ")):
-                                if middle_name + '(' in content:
-                                    middle_files.append(file_path)
-                                    skip = True
-                        if not skip:
-                            entry_files.append(file_path)
+                    content = self.ast_manager.read_source(file_path)
+                    names = None
+                    if self.prefilter == utils.constants.IMPORT_FILTER:
+                        try:
+                            names = self.ast_manager.get_imports_and_calls(file_path)
+                        except SyntaxError:
+                            pass
+                    is_sink, is_middle = matcher.classify(content, names)
+                    if is_sink:
+                        matching_files.append(file_path)
+                        skip = True
+                    if is_middle:
+                        middle_files.append(file_path)
+                        skip = True
+                    if not skip:
+                        entry_files.append(file_path)
                 except Exception as e:
                     print(f"Error reading {file_path}: {e}")
 
@@ -188,9 +211,125 @@ class CallGraphGenerator(object):
         entry_files[:0] = matching_files
         return entry_files, matching_files, middle_files
 
-    def do_pass(self, cls, install_hooks=False, *args, **kwargs):
-        modules_analyzed = set()
-        for index, entry_point in enumerate(self.entry_points):
+    def _get_state_key(self):
+        sinks = None
+        if self.sink_points and os.path.isfile(self.sink_points):
+            with open(self.sink_points, "r", encoding="utf-8") as f:
+                sinks = f.read()
+        return repr((
+            os.path.abspath(self.package), sinks, self.max_iter, self.operation, self.complete, self.prefilter,
+            self.max_points_to,
+        ))
+
+    def get_digests(self):
+        # every module of the package may be reached through an import,
+        # including the ones find_entry_and_sink skips
+        digests = {}
+        for root, dirs, files in os.walk(self.package):
+            for file in files:
+                if not file.endswith('.py'):
+                    continue
+                file_path = os.path.join(root, file)
+                try:
+                    with open(file_path, "rt", errors="replace") as f:
+                        digests[os.path.relpath(file_path, self.package)] = get_digest(f.read())
+                except OSError:
+                    continue
+        return digests
+
+    def _get_imported_modules(self, filename):
+        modname = self._get_mod_name(filename, self.package)
+        package = modname.split(".")
+        imported = set()
+        for node in ast.walk(self.ast_manager.get_tree(filename)):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = []
+                if node.level:
+                    # __init__ modules are named after their package
+                    level = node.level - 1 if filename.endswith("__init__.py") else node.level
+                    base = package[:len(package) - level]
+                if node.module:
+                    base = base + node.module.split(".")
+                names = [".".join(base)] + [".".join(base + [alias.name]) for alias in node.names]
+            else:
+                continue
+            for name in names:
+                parts = name.split(".")
+                for idx in range(1, len(parts) + 1):
+                    imported.add(".".join(parts[:idx]))
+        return imported
+
+    def reuse_state(self, digests, candidates):
+        state = self.snapshot_manager.load()
+        if not state:
+            return False
+
+        old_digests = state["digests"]
+        changed = {f for f in set(digests) | set(old_digests) if digests.get(f) != old_digests.get(f)}
+        # the changed files are given relative to the package
+        for file_path in self.changed_files or []:
+            changed.add(os.path.relpath(os.path.join(self.package, file_path), self.package))
+
+        # a file that is or was a sink/middle candidate always takes part in the analysis
+        candidates = {os.path.relpath(f, self.package) for f in candidates}
+        if not changed.isdisjoint(candidates) or not changed.isdisjoint(state["candidates"]):
+            return False
+
+        # invalidate the changed modules and every module that imports them
+        dirty = set()
+        for file_path in changed:
+            dirty.add(self._get_mod_name(os.path.join(self.package, file_path), self.package))
+        stack = list(dirty)
+        while stack:
+            for importer in state["reverse_imports"].get(stack.pop(), ()):
+                if importer not in dirty:
+                    dirty.add(importer)
+                    stack.append(importer)
+
+        analyzed = state["analyzed_modules"]
+        if not dirty.isdisjoint(analyzed):
+            return False
+
+        # a changed module that now imports an analyzed module joins the analysis
+        for file_path in changed:
+            file_path = os.path.join(self.package, file_path)
+            if not os.path.exists(file_path):
+                continue
+            try:
+                if not analyzed.isdisjoint(self._get_imported_modules(file_path)):
+                    return False
+            except SyntaxError:
+                return False
+
+        for name in STATE_ATTRS:
+            setattr(self, name, state[name])
+        self.closure_manager = ClosureManager(self.def_manager)
+        # the import graph was not rebuilt, keep the previous one
+        state["digests"] = digests
+        state["candidates"] = candidates
+        self.snapshot_manager.store(state)
+        return True
+
+    def store_state(self, digests, candidates):
+        reverse_imports = {}
+        for modname, node in self.import_manager.get_import_graph().items():
+            for imported in node["imports"]:
+                reverse_imports.setdefault(imported, set()).add(modname)
+
+        state = {name: getattr(self, name) for name in STATE_ATTRS}
+        state["digests"] = digests
+        state["candidates"] = {os.path.relpath(f, self.package) for f in candidates}
+        state["reverse_imports"] = reverse_imports
+        self.snapshot_manager.store(state)
+
+    def do_pass(self, cls, set_pkg=False, *args, entry_points=None, modules_analyzed=None, **kwargs):
+        if entry_points is None:
+            entry_points = self.entry_points
+        if modules_analyzed is None:
+            modules_analyzed = set()
+        for index, entry_point in enumerate(entry_points):
             input_pkg = self.package
             input_mod = self._get_mod_name(entry_point, input_pkg)
             input_file = os.path.abspath(entry_point)
@@ -202,24 +341,82 @@ class CallGraphGenerator(object):
                 input_pkg = os.path.dirname(input_file)
 
             if input_mod not in modules_analyzed:
-                if install_hooks:
+                if set_pkg:
                     self.import_manager.set_pkg(input_pkg)
-                    self.import_manager.install_hooks()
-
-                processor = cls(
-                    input_file,
-                    input_mod,
-                    modules_analyzed=modules_analyzed,
-                    *args,
-                    **kwargs,
-                )
-                processor.analyze()
-                modules_analyzed = modules_analyzed.union(
-                    processor.get_modules_analyzed()
-                )
-
-                if install_hooks:
-                    self.remove_import_hooks()
+
+                with tracer.span(cls.__name__, "entry point", module=input_mod):
+                    processor = cls(
+                        input_file,
+                        input_mod,
+                        modules_analyzed=modules_analyzed,
+                        *args,
+                        **kwargs,
+                    )
+                    processor.analyze()
+                modules_analyzed |= processor.get_modules_analyzed()
+
+        return modules_analyzed
+
+    def get_post_components(self, scheduled):
+        # entry points grouped by the cycles of the import graph, every group
+        # comes after the groups of the modules it imports
+        entries = {}
+        for entry_point in self.entry_points:
+            modname = self._get_mod_name(entry_point, self.package)
+            if modname and modname not in entries and modname not in scheduled:
+                entries[modname] = entry_point
+
+        def get_successors(modname):
+            return [imp for imp in self.import_manager.get_imports(modname) if imp in entries]
+
+        order = {modname: index for index, modname in enumerate(entries)}
+        components = []
+        for members in iter_components(list(entries), get_successors):
+            members.sort(key=order.get)
+            components.append((set(members), [entries[modname] for modname in members]))
+        return components
+
+    def post_process_component(self, members, entry_points, round_analyzed, dependency_manager, module_passes):
+        # revisits the modules of one import cycle until they add nothing new;
+        # an iteration spends at most MAX_COMPONENT_PASSES on a cycle, and
+        # max_iter bounds the passes over every module across all iterations
+        limit = utils.constants.MAX_COMPONENT_PASSES
+        if self.max_iter >= 0:
+            limit = min(limit, self.max_iter - max(module_passes.get(modname, 0) for modname in members))
+        passes = 0
+        # every pass may visit again the modules the earlier passes pulled in
+        analyzed = round_analyzed - members
+        while passes < limit:
+            state = self.extract_state()
+            self.reset_counters()
+            round_analyzed |= self.do_pass(
+                PostProcessor,
+                False,
+                self.import_manager,
+                self.scope_manager,
+                self.def_manager,
+                self.class_manager,
+                self.module_manager,
+                self.source_manager,
+                self.middle_manager,
+                self.intersection_manager,
+                self.sink_manager,
+                entry_points=entry_points,
+                modules_analyzed=set(analyzed),
+                ast_manager=self.ast_manager,
+                closure_manager=self.closure_manager,
+                dependency_manager=dependency_manager,
+            )
+            passes += 1
+            self.def_manager.complete_definitions()
+            # the modules of later cycles read the potent methods found here
+            self.sink_manager.transitive_potent_method()
+            dependency_manager.check_external()
+            if self.extract_state() == state:
+                break
+        for modname in members:
+            module_passes[modname] = module_passes.get(modname, 0) + passes
+        return passes
 
     def load_sink_points(self):
         try:
@@ -242,7 +439,19 @@ class CallGraphGenerator(object):
         self.middle_manager.set_resource_methods(['openai:create:0'])
         # Consider all methods within the large model framework as entry points,
         # and designate those containing risky substrings as target points.
-        entry_files, matching_files, middle_files = self.find_entry_and_sink()
+        with tracer.span("find_entry_and_sink", "phase"):
+            entry_files, matching_files, middle_files = self.find_entry_and_sink()
+        memory_profiler.record("find_entry_and_sink", self.get_memory_counts, sinks=self.sink_points)
+
+        digests = None
+        if self.snapshot_manager:
+            digests = self.get_digests()
+            if self.reuse_state(digests, matching_files + middle_files):
+                total_end_time = time.time()
+                print("no change reaches the analyzed modules, reusing the previous results")
+                print(f"total execution time: {total_end_time - total_start_time} seconds")
+                tracer.add_span("analyze", "phase", total_start_time, total_end_time, sinks=self.sink_points, reused=True)
+                return
 
         self.middle_manager.set_potent_files(middle_files)
         self.sink_manager.set_potent_files(matching_files)
@@ -262,11 +471,14 @@ class CallGraphGenerator(object):
             self.source_manager,
             self.middle_manager,
             self.sink_manager,
-            self.location_messages
+            self.location_messages,
+            ast_manager=self.ast_manager,
         )
         self.sink_manager.filter_potent_sink_module()
         llm_end_time = time.time()
         print(f"llm processor execution time: {llm_end_time - llm_start_time} seconds")
+        tracer.add_span("location processor", "phase", llm_start_time, llm_end_time)
+        memory_profiler.record("location processor", self.get_memory_counts, sinks=self.sink_points)
 
         self.entry_points = entry_files
         print("start import processor-1")
@@ -284,11 +496,14 @@ class CallGraphGenerator(object):
             self.middle_manager,
             self.sink_manager,
             self.import_chain,
-            self.complete
+            self.complete,
+            ast_manager=self.ast_manager,
         )
 
         import_end_time = time.time()
         print(f"import processor-1 execution time: {import_end_time - import_start_time} seconds")
+        tracer.add_span("import processor-1", "phase", import_start_time, import_end_time)
+        memory_profiler.record("import processor-1", self.get_memory_counts, sinks=self.sink_points)
 
         print("start import processor-2")
         import_start_time = time.time()
@@ -300,11 +515,13 @@ class CallGraphGenerator(object):
 
         import_end_time = time.time()
         print(f"import processor-2 execution time: {import_end_time - import_start_time} seconds")
+        tracer.add_span("import processor-2", "phase", import_start_time, import_end_time)
+        memory_profiler.record("import processor-2", self.get_memory_counts, sinks=self.sink_points)
 
         print("start pre processor")
         pre_start_time = time.time()
         self.entry_points = self.source_manager.get_source_files()
-        self.do_pass(
+        self.analyzed_modules |= self.do_pass(
             PreProcessor,
             False,
             self.import_manager,
@@ -313,42 +530,54 @@ class CallGraphGenerator(object):
             self.class_manager,
             self.module_manager,
             self.sink_manager,
+            ast_manager=self.ast_manager,
         )
         self.def_manager.complete_definitions()
         pre_end_time = time.time()
         print(f"pre processor execution time: {pre_end_time - pre_start_time} seconds")
+        tracer.add_span("pre processor", "phase", pre_start_time, pre_end_time)
+        memory_profiler.record("pre processor", self.get_memory_counts, sinks=self.sink_points)
 
         print("start post processor")
         post_start_time = time.time()
         iter_cnt = 0
+        module_passes = {}
+        dependency_manager = self.set_dependency_manager(DependencyManager(self.get_external_signature))
         while (self.max_iter < 0 or iter_cnt < self.max_iter) and (not self.has_converged()):
+            iter_start_time = time.time()
             self.state = self.extract_state()
-            self.reset_counters()
-            self.do_pass(
-                PostProcessor,
-                False,
-                self.import_manager,
-                self.scope_manager,
-                self.def_manager,
-                self.class_manager,
-                self.module_manager,
-                self.source_manager,
-                self.middle_manager,
-                self.intersection_manager,
-                self.sink_manager,
-            )
-
-            self.def_manager.complete_definitions()
-            self.sink_manager.transitive_potent_method()
+            dependency_manager.reset_counts()
+            round_analyzed = set()
+            scheduled = set()
+            passes = 0
+            # the post processor adds source files, they are visited in the same iteration
+            components = self.get_post_components(scheduled)
+            while components:
+                for members, entry_points in components:
+                    passes += self.post_process_component(members, entry_points, round_analyzed, dependency_manager,
+                                                          module_passes)
+                    scheduled |= members
+                components = self.get_post_components(scheduled)
+            self.analyzed_modules |= round_analyzed
+
+            visited, skipped = dependency_manager.get_counts()
+            print(f"post processor iteration {iter_cnt} visited {visited} units, skipped {skipped}, "
+                  f"{passes} passes over {len(scheduled)} modules")
+            tracer.add_span("post processor iteration", "iteration", iter_start_time, time.time(),
+                            iteration=iter_cnt, visited=visited, skipped=skipped, passes=passes)
             iter_cnt += 1
+        self.set_dependency_manager(None)
         post_end_time = time.time()
         print(f"post processor execution time: {post_end_time - post_start_time} seconds")
+        tracer.add_span("post processor", "phase", post_start_time, post_end_time, iterations=iter_cnt,
+                        widened=sorted(self.def_manager.get_widened()))
+        memory_profiler.record("post processor", self.get_memory_counts, sinks=self.sink_points)
         print('sink files: ' + str(len(self.sink_manager.get_nodes())))
         print("start callgraph processor")
         cg_start_time = time.time()
         self.reset_counters()
         if self.operation == utils.constants.CALL_GRAPH_OP:
-            self.do_pass(
+            self.analyzed_modules |= self.do_pass(
                 CallGraphProcessor,
                 False,
                 self.import_manager,
@@ -361,9 +590,11 @@ class CallGraphGenerator(object):
                 self.middle_manager,
                 self.context_manager,
                 call_graph=self.cg,
+                ast_manager=self.ast_manager,
+                closure_manager=self.closure_manager,
             )
         elif self.operation == utils.constants.KEY_ERR_OP:
-            self.do_pass(
+            self.analyzed_modules |= self.do_pass(
                 KeyErrProcessor,
                 False,
                 self.import_manager,
@@ -371,13 +602,50 @@ class CallGraphGenerator(object):
                 self.def_manager,
                 self.class_manager,
                 self.key_errs,
+                ast_manager=self.ast_manager,
+                closure_manager=self.closure_manager,
             )
         else:
             raise Exception("Invalid operation: " + self.operation)
         cg_end_time = time.time()
         print(f"cg processor execution time: {cg_end_time - cg_start_time} seconds")
+        tracer.add_span("cg processor", "phase", cg_start_time, cg_end_time)
+        memory_profiler.record("cg processor", self.get_memory_counts, sinks=self.sink_points)
+        if self.parse_cache:
+            self.parse_cache.prune()
+        if self.snapshot_manager:
+            self.store_state(digests, matching_files + middle_files)
         total_end_time = time.time()
         print(f"total execution time: {total_end_time - total_start_time} seconds")
+        tracer.add_span("analyze", "phase", total_start_time, total_end_time, sinks=self.sink_points)
+
+    def get_memory_counts(self):
+        defs = self.def_manager.get_defs()
+        pointer_entries = 0
+        for defi in defs.values():
+            name_pointer = defi.get_name_pointer()
+            pointer_entries += len(name_pointer.get()) + len(defi.get_lit_pointer().get())
+            pointer_entries += len(defi.get_taint_pointer().get())
+            for arg_values in name_pointer.get_args().values():
+                pointer_entries += len(arg_values)
+        scopes = self.scope_manager.get_scopes()
+        return {
+            "definitions": len(defs),
+            "pointer_entries": pointer_entries,
+            "closure_entries": sum(len(v) for v in self.def_manager.pre_closured.values()),
+            "closure_sets": len(self.def_manager.result_sets),
+            "symbols": len(self.def_manager.get_symbol_manager()),
+            "tainted": len(self.def_manager.tainted),
+            "scopes": len(scopes),
+            "scope_names": sum(len(scope.get_defs()) for scope in scopes.values()),
+            "classes": len(self.class_manager.get_classes()),
+            "modules": len(self.module_manager.get_internal_modules()) + len(self.module_manager.get_external_modules()),
+            "cg_nodes": len(self.cg.get()),
+            "cg_edges": sum(len(dsts) for dsts in self.cg.get().values()),
+            "widened": len(self.def_manager.get_widened()),
+            "asts": len(self.ast_manager.get_trees()),
+            "source_chars": sum(len(contents) for contents in self.ast_manager.contents.values()),
+        }
 
     def output(self):
         return self.cg.get()
@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pycg import formats
+from pycg.pycallgraph import CallGraphGenerator
+from pycg.utils.constants import CALL_GRAPH_OP
+
+SINK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sink_files")
+
+
+class TestBase(TestCase):
+    """
+    Analyzes a package written into a temporary directory, for the cases
+    that can only be checked on the reported sink paths.
+    """
+
+    sinks = "RCE-sinks"
+
+    def setUp(self):
+        self.package = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.package)
+
+    def write_module(self, modname, source):
+        with open(os.path.join(self.package, modname + ".py"), "w") as f:
+            f.write(source)
+
+    def analyze(self, **kwargs):
+        cg = CallGraphGenerator(None, os.path.join(SINK_DIR, self.sinks), self.package, -1, CALL_GRAPH_OP, False,
+                                **kwargs)
+        cg.analyze()
+        return cg
+
+    def get_paths(self, cg):
+        return [path["path"] for path in formats.Simple(cg).generate().values()]
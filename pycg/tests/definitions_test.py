@@ -0,0 +1,68 @@
+from unittest import TestCase, main
+
+from pycg import utils
+from pycg.machinery.closures import ClosureManager
+from pycg.machinery.definitions import DefinitionManager
+
+
+class DefinitionManagerTest(TestCase):
+    def setUp(self):
+        self.def_manager = DefinitionManager()
+        self.def_manager.create("mod", utils.constants.MOD_DEF, "mod")
+        fun = self.def_manager.create("mod.fun", utils.constants.FUN_DEF, "mod")
+        self.def_manager.create("mod.fun.param", utils.constants.NAME_DEF, "mod")
+        fun.get_name_pointer().add_pos_arg(0, "param", "mod.fun.param")
+
+    def test_arguments_reach_parameters(self):
+        caller = self.def_manager.create("mod.caller", utils.constants.NAME_DEF, "mod")
+        self.def_manager.create("mod.arg", utils.constants.NAME_DEF, "mod")
+        caller.get_name_pointer().add("mod.fun")
+        caller.get_name_pointer().add_pos_arg(0, None, "mod.arg")
+        self.def_manager.complete_definitions()
+        self.assertEqual(self.def_manager.get("mod.fun.param").get_name_pointer().get(), {"mod.arg"})
+
+    def test_late_argument_reaches_parameter(self):
+        caller = self.def_manager.create("mod.caller", utils.constants.NAME_DEF, "mod")
+        caller.get_name_pointer().add("mod.fun")
+        caller.get_name_pointer().add_pos_arg(0, None, "mod.later")
+        self.def_manager.complete_definitions()
+        # the argument only becomes a definition after the first closure
+        self.def_manager.create("mod.later", utils.constants.NAME_DEF, "mod")
+        self.def_manager.complete_definitions()
+        self.assertEqual(self.def_manager.get("mod.fun.param").get_name_pointer().get(), {"mod.later"})
+
+
+class ClosureManagerTest(TestCase):
+    def setUp(self):
+        self.def_manager = DefinitionManager()
+        self.closure_manager = ClosureManager(self.def_manager)
+        self.def_manager.create("mod", utils.constants.MOD_DEF, "mod")
+        self.def_manager.create("mod.fun", utils.constants.FUN_DEF, "mod")
+        self.first = self.def_manager.create("mod.first", utils.constants.NAME_DEF, "mod")
+        self.second = self.def_manager.create("mod.second", utils.constants.NAME_DEF, "mod")
+        self.second.get_name_pointer().add("mod.first")
+
+    def test_closure_is_read_by_name(self):
+        self.first.get_name_pointer().add("mod.fun")
+        closured = self.closure_manager.get_closure()
+        self.assertEqual(closured.get("mod.second"), {"mod.fun"})
+        self.assertEqual(closured["mod.first"], {"mod.fun"})
+        self.assertIsNone(closured.get("mod.missing"))
+        self.assertNotIn("mod.missing", closured)
+
+    def test_closure_follows_later_changes(self):
+        self.closure_manager.get_closure()
+        self.first.get_name_pointer().add("mod.fun")
+        self.assertEqual(self.closure_manager.get_closure().get("mod.second"), {"mod.fun"})
+
+    def test_taints_are_read_by_name(self):
+        self.second.get_taint_pointer().add("mod.first")
+        self.first.mark_sink()
+        taints = self.closure_manager.get_taints()
+        self.assertIn("mod.first", taints)
+        self.assertIn("mod.second", taints)
+        self.assertNotIn("mod.fun", taints)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from unittest import TestCase, main
+
+from pycg import utils
+from pycg.machinery.definitions import DefinitionManager
+from pycg.machinery.dependencies import DependencyManager
+
+
+class DependencyManagerTest(TestCase):
+    def setUp(self):
+        self.def_manager = DefinitionManager()
+        self.dependency_manager = DependencyManager()
+        self.def_manager.set_dependency_manager(self.dependency_manager)
+        self.callee = self.def_manager.create("mod.callee", utils.constants.FUN_DEF, "mod")
+        self.def_manager.create("mod.handler", utils.constants.FUN_DEF, "mod")
+        self.def_manager.create("mod.other", utils.constants.FUN_DEF, "mod")
+        self.callee.get_name_pointer().add_pos_arg(0, "cb", "mod.handler")
+
+    def visit(self, unit):
+        # a unit that reads the arguments of the callee
+        self.dependency_manager.begin(None)
+        self.def_manager.get("mod.callee").get_name_pointer().get_pos_arg(0)
+        self.dependency_manager.end(unit, None)
+
+    def test_unchanged_unit_is_clean(self):
+        self.visit(("mod.caller",))
+        self.assertTrue(self.dependency_manager.is_clean(("mod.caller",), None))
+
+    def test_argument_change_dirties_reader(self):
+        self.visit(("mod.caller",))
+        # only the points-to set of the argument changes
+        self.callee.get_name_pointer().add_pos_arg(0, "cb", "mod.other")
+        self.assertFalse(self.dependency_manager.is_clean(("mod.caller",), None))
+
+
+if __name__ == "__main__":
+    main()
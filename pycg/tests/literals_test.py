@@ -0,0 +1,68 @@
+from unittest import main
+
+from pycg.machinery.pointers import MAX_LITERAL_LENGTH, MAX_LITERALS
+from pycg.tests.base import TestBase
+
+# every assignment adds a literal to key, more than a definition keeps
+KEYS = "".join(f'    key = "k{index}"\n' for index in range(MAX_LITERALS + 1))
+
+COLLAPSED = '''
+def run_code(code):
+    exec(code)
+
+
+def read_key(code):
+''' + KEYS + '''    key = "run"
+    h = run_code
+    handlers = {"run": h}
+    handlers[key](code)
+
+
+def write_key(code):
+''' + KEYS + '''    key = "run"
+    h = run_code
+    handlers = {key: h}
+    handlers["run"](code)
+
+
+def main(code):
+    read_key(code)
+    write_key(code)
+
+
+main(input())
+'''
+
+LONG_KEY = "run." + "x" * MAX_LITERAL_LENGTH
+
+SHORTENED = '''
+def run_code(code):
+    exec(code)
+
+
+def main(code):
+    h = run_code
+    handlers = {"''' + LONG_KEY + '''": h}
+    key = "''' + LONG_KEY + '''"
+    handlers[key](code)
+
+
+main(input())
+'''
+
+
+class LiteralsTest(TestBase):
+    def test_dict_key_resolves_after_collapse(self):
+        self.write_module("main", COLLAPSED)
+        paths = self.get_paths(self.analyze())
+        self.assertIn("main -> main.main -> main.read_key -> main.run_code -> <builtin>.exec", paths)
+        self.assertIn("main -> main.main -> main.write_key -> main.run_code -> <builtin>.exec", paths)
+
+    def test_long_dict_key_resolves(self):
+        self.write_module("main", SHORTENED)
+        paths = self.get_paths(self.analyze())
+        self.assertIn("main -> main.main -> main.run_code -> <builtin>.exec", paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from unittest import TestCase, main
+
+from pycg import utils
+from pycg.machinery.definitions import DefinitionManager
+from pycg.machinery.pointers import MAX_LITERAL_LENGTH, MAX_LITERALS, LiteralPointer, get_literal
+
+
+class LiteralPointerTest(TestCase):
+    def setUp(self):
+        self.pointer = LiteralPointer()
+
+    def test_short_literals_are_kept(self):
+        self.pointer.add("run")
+        self.pointer.add(3)
+        self.pointer.add(3.5)
+        self.assertEqual(self.pointer.get(), {"run", 3, LiteralPointer.UNK_LIT})
+
+    def test_long_literal_is_shortened(self):
+        long_key = "run." + "x" * MAX_LITERAL_LENGTH
+        self.pointer.add(long_key)
+        self.assertEqual(self.pointer.get(), {get_literal(long_key)})
+        self.assertLessEqual(len(get_literal(long_key)), MAX_LITERAL_LENGTH)
+        # the shortened form can be the last part of a namespace
+        self.assertNotIn(".", get_literal(long_key))
+        self.assertNotEqual(get_literal(long_key), get_literal(long_key + "y"))
+
+    def test_literals_collapse_past_the_limit(self):
+        for index in range(MAX_LITERALS - 1):
+            self.pointer.add(f"k{index}")
+        self.pointer.add(1)
+        self.assertEqual(len(self.pointer.get()), MAX_LITERALS)
+        self.pointer.add("last")
+        self.assertEqual(self.pointer.get(), {LiteralPointer.STR_LIT, LiteralPointer.INT_LIT})
+
+    def test_collapsed_set_absorbs_new_values(self):
+        for index in range(MAX_LITERALS + 1):
+            self.pointer.add(f"k{index}")
+        self.pointer.add("new")
+        self.pointer.add(2)
+        self.assertEqual(self.pointer.get(), {LiteralPointer.STR_LIT, 2})
+        self.assertEqual(self.pointer.get_abstract(7), 7)
+        self.assertEqual(self.pointer.get_abstract("other"), LiteralPointer.STR_LIT)
+
+
+class NamePointerWideningTest(TestCase):
+    def setUp(self):
+        self.def_manager = DefinitionManager()
+        self.def_manager.set_max_points_to(2)
+        self.def_manager.create("mod", utils.constants.MOD_DEF, "mod")
+        for name in ("run", "log", "skip", "late"):
+            self.def_manager.create("mod." + name, utils.constants.FUN_DEF, "mod")
+        self.handler = self.def_manager.create("mod.handler", utils.constants.NAME_DEF, "mod")
+        self.pointer = self.handler.get_name_pointer()
+
+    def test_small_set_is_kept(self):
+        self.pointer.add("mod.run")
+        self.pointer.add("mod.log")
+        self.assertFalse(self.def_manager.is_widened("mod.handler"))
+        self.assertEqual(self.pointer.get(), {"mod.run", "mod.log"})
+
+    def test_large_set_is_summarized(self):
+        self.pointer.add_set({"mod.run", "mod.log", "mod.skip"})
+        summary = self.def_manager.get_summary_name("mod")
+        self.assertEqual(self.def_manager.get_widened(), {"mod.handler": 3})
+        self.assertEqual(self.pointer.get(), {summary})
+        # readers still see every target the summary stands for
+        self.assertEqual(self.def_manager.get_targets(self.handler), {"mod.run", "mod.log", "mod.skip"})
+
+    def test_widened_set_keeps_growing_through_the_summary(self):
+        self.pointer.add_set({"mod.run", "mod.log", "mod.skip"})
+        self.assertFalse(self.pointer.holds("mod.late"))
+        self.pointer.add("mod.late")
+        self.assertTrue(self.pointer.holds("mod.late"))
+        self.assertEqual(len(self.pointer.get()), 1)
+        self.assertIn("mod.late", self.def_manager.get_targets(self.handler))
+
+
+if __name__ == "__main__":
+    main()
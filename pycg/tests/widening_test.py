@@ -0,0 +1,46 @@
+from unittest import main
+
+from pycg.tests.base import TestBase
+
+DISPATCHER = '''
+def run_code(code):
+    exec(code)
+
+
+def log_code(code):
+    print(code)
+
+
+def skip_code(code):
+    return code
+
+
+def dispatch(name, code):
+    h = run_code
+    if name == "log":
+        h = log_code
+    if name == "skip":
+        h = skip_code
+    h(code)
+
+
+def main(code):
+    dispatch("run", code)
+
+
+main(input())
+'''
+
+
+class WideningTest(TestBase):
+    def test_sink_path_survives_widening(self):
+        self.write_module("main", DISPATCHER)
+        paths = self.get_paths(self.analyze())
+        cg = self.analyze(max_points_to=2)
+        self.assertIn("main.dispatch.h", cg.def_manager.get_widened())
+        self.assertIn("main -> main.main -> main.dispatch -> main.run_code -> <builtin>.exec", paths)
+        self.assertEqual(self.get_paths(cg), paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@
 # under the License.
 #
 import os
+import sys
 
 
 def get_lambda_name(counter):
@@ -42,7 +43,8 @@ def get_ret_name(counter):
 
 
 def join_ns(*args):
-    return ".".join([arg for arg in args])
+    # the same namespaces are built over and over, keep a single copy of each
+    return sys.intern(".".join([arg for arg in args]))
 
 
 def to_mod_name(name, package=None):
@@ -23,6 +23,7 @@ EXCEPTION_NAME = "<EXCEPTION>"
 LAMBDA_NAME = "<LAMBDA_{}>"  # needs to be formatted
 BUILTIN_NAME = "<builtin>"
 EXT_NAME = "<external>"
+SUMMARY_NAME = "<SUMMARY>"
 
 FUN_DEF = "FUNCTIONDEF"
 NAME_DEF = "NAMEDEF"
@@ -48,3 +49,10 @@ NO_CHANGE = "NO_CHANGE"
 BOTH_CHANGE = "BOTH_CHANGE"
 NAME_CHANGE = "NAME_CHANGE"
 TAINT_CHANGE = "TAINT_CHANGE"
+
+SUBSTRING_FILTER = "substring"
+IMPORT_FILTER = "imports"
+
+# passes over one import cycle before the post processor moves on, the next
+# iteration revisits the cycle if it stopped short of converging
+MAX_COMPONENT_PASSES = 10
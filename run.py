@@ -1,49 +1,156 @@
+import argparse
+import json
 import os
+import resource
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pycg.utils.constants import IMPORT_FILTER, SUBSTRING_FILTER
 
 base_dir = "/data/OpenAgentBenchmarks/"
 sinks_dir = "/root/PyCG/sink_files"
 output_base_dir = "/root/result"
+python_bin = "/root/anaconda3/bin/python"
+
 
-os.makedirs(output_base_dir, exist_ok=True)
+def get_sinks_name(sinks_file):
+    return os.path.basename(sinks_file).replace(".txt", "")
 
-projects = [name for name in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, name))]
 
-sinks_files = [os.path.join(sinks_dir, f) for f in os.listdir(sinks_dir) if os.path.isfile(os.path.join(sinks_dir, f))]
+def get_outputs(project_output_dir, sinks_files):
+    return [os.path.join(project_output_dir, f"{get_sinks_name(f)}.json") for f in sinks_files]
 
-for project in projects:
-    project_path = os.path.join(base_dir, project)
-    project_output_dir = os.path.join(output_base_dir, project)
+
+def run_project(project, args, sinks_files, cache_dir):
+    project_path = os.path.join(args.base_dir, project)
+    project_output_dir = os.path.join(args.output_dir, project)
     os.makedirs(project_output_dir, exist_ok=True)
 
-    print(f"🔍 Processing project: {project}")
+    # every sink family is analyzed by a single process so that discovery and
+    # parsing are shared; results land in <project_output_dir>/<sinks_name>.json
+    log_file = os.path.join(project_output_dir, "pycg.log")
+    outputs = get_outputs(project_output_dir, sinks_files)
 
-    for sinks_file in sinks_files:
-        sinks_name = os.path.basename(sinks_file).replace(".txt", "")
+    command = [
+        args.python, "-m", "pycg",
+        "--package", project_path,
+        "--output", project_output_dir if len(sinks_files) > 1 else outputs[0],
+        "--sinks", *sinks_files,
+        "--max-iter", str(args.max_iter),
+        "--cache-dir", cache_dir,
+        "--prefilter", args.prefilter
+    ]
 
-        output_json = os.path.join(project_output_dir, f"{sinks_name}.json")
-        log_file = os.path.join(project_output_dir, f"{sinks_name}.log")
+    job = {"project": project, "log": log_file, "outputs": outputs}
+    start = time.time()
+    with open(log_file, "w") as log:
+        log.write(' '.join(command) + "\n")
+        log.flush()
+        try:
+            # preexec_fn is not safe once the pool has started threads, so the
+            # cap is set on the child from here right after it is spawned
+            proc = subprocess.Popen(command, stdout=log, stderr=log, text=True)
+            try:
+                if args.max_memory:
+                    max_memory = args.max_memory * 1024 * 1024
+                    resource.prlimit(proc.pid, resource.RLIMIT_AS, (max_memory, max_memory))
+                returncode = proc.wait(timeout=args.timeout)
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            job["returncode"] = returncode
+            if returncode == 0:
+                job["status"] = "success"
+            elif returncode < 0:
+                job["status"] = "killed"
+            else:
+                # a MemoryError raised under the address space cap ends up here
+                job["status"] = "failed"
+        except subprocess.TimeoutExpired:
+            job["status"] = "timeout"
+            log.write(f"Timeout: exceeded {args.timeout} seconds\n")
+        except Exception as e:
+            job["status"] = "error"
+            log.write(f"Error: {e}\n")
+    job["time"] = time.time() - start
+    return job
 
-        command = [
-            "/root/anaconda3/bin/python", "-m", "pycg",
-            "--package", project_path,
-            "--output", output_json,
-            "--sinks", sinks_file,
-            "--max-iter", "33"
-        ]
 
-        print(f"  ➡ Running with sinks: {sinks_name}")
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-dir", help="Directory holding the projects to analyze", default=base_dir)
+    parser.add_argument("--sinks-dir", help="Directory holding the sink files", default=sinks_dir)
+    parser.add_argument("--output-dir", help="Directory receiving the results", default=output_base_dir)
+    parser.add_argument("--python", help="Interpreter used to run pycg", default=python_bin)
+    parser.add_argument("--max-iter", type=int, help="Maximum number of iterations", default=33)
+    parser.add_argument("--prefilter", choices=[SUBSTRING_FILTER, IMPORT_FILTER],
+                        help="How pycg selects candidate sink files", default=SUBSTRING_FILTER)
+    parser.add_argument("-j", "--jobs", type=int, help="Number of projects analyzed concurrently",
+                        default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, help="Wall-clock limit per project, in seconds", default=None)
+    parser.add_argument("--max-memory", type=int,
+                        help="Address space limit per project, in megabytes (RLIMIT_AS caps virtual memory, "
+                             "not RSS, so leave headroom above the expected resident size)", default=None)
+    parser.add_argument("--force", action="store_true", help="Re-analyze projects whose results already exist",
+                        default=False)
+    args = parser.parse_args()
 
-        with open(log_file, "w") as log:
-            try:
-                print(' '.join(command))
-                result = subprocess.run(command, stdout=log, stderr=log, text=True)
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache_dir = os.path.join(args.output_dir, ".pycg-cache")
+    manifest_file = os.path.join(args.output_dir, "manifest.json")
+
+    projects = sorted(name for name in os.listdir(args.base_dir)
+                      if os.path.isdir(os.path.join(args.base_dir, name)))
+
+    sinks_files = sorted(os.path.join(args.sinks_dir, f) for f in os.listdir(args.sinks_dir)
+                         if os.path.isfile(os.path.join(args.sinks_dir, f)))
+
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+
+    pending = []
+    for project in projects:
+        outputs = get_outputs(os.path.join(args.output_dir, project), sinks_files)
+        if not args.force and all(os.path.exists(output) for output in outputs):
+            print(f"  ⏭ Skipping {project}, results already exist")
+            manifest.setdefault(project, {"project": project, "status": "success", "outputs": outputs})
+            continue
+        pending.append(project)
+
+    def write_manifest():
+        tmp_file = manifest_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, manifest_file)
+
+    # the analyses run in their own processes, the pool threads only wait on them
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        futures = {}
+        for project in pending:
+            print(f"🔍 Processing project: {project}")
+            futures[executor.submit(run_project, project, args, sinks_files, cache_dir)] = project
+
+        for future in as_completed(futures):
+            job = future.result()
+            manifest[job["project"]] = job
+            write_manifest()
+
+            if job["status"] == "success":
+                print(f"  ✅ Successfully processed {job['project']} in {job['time']:.1f}s")
+            else:
+                print(f"  ❌ {job['status'].capitalize()} processing {job['project']}, check {job['log']} for details")
+
+    write_manifest()
+    statuses = [job["status"] for job in manifest.values()]
+    print(f"Finished: {statuses.count('success')} succeeded, {statuses.count('timeout')} timed out, "
+          f"{len(statuses) - statuses.count('success') - statuses.count('timeout')} failed; see {manifest_file}")
+    return 0 if statuses.count("success") == len(statuses) else 1
 
-                if result.returncode == 0:
-                    print(f"  ✅ Successfully processed {project} with {sinks_name}, results saved to {output_json}")
-                else:
-                    print(f"  ❌ Failed processing {project} with {sinks_name}, check {log_file} for details")
 
-            except Exception as e:
-                print(f"  ❌ Error processing {project} with {sinks_name}: {e}")
-                log.write(f"Error: {e}\n")
+if __name__ == "__main__":
+    sys.exit(main())